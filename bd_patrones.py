@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+bd_patrones.py
+--------------
+
+Bases de datos de patrones (PDB): tablas con la distancia exacta a la
+meta en un espacio abstracto del problema, que sirven como heurísticas
+admisibles.
+
+Las tablas se construyen una sola vez con una búsqueda a lo ancho hacia
+atrás desde la meta, se guardan en disco empacadas (4 u 8 bits por
+entrada) y se cargan con mmap, de modo que varios procesos que resuelven
+problemas al mismo tiempo comparten una sola copia en memoria.
+
+"""
+
+import mmap
+import os
+from math import factorial
+
+
+DIRECTORIO_TABLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablas')
+
+_MAGICO = b'BDP1'
+_ENCABEZADO = 16
+
+
+def num_variaciones(n, k):
+    """
+    Número de arreglos ordenados de k elementos distintos tomados de range(n).
+
+    """
+    return factorial(n) // factorial(n - k)
+
+
+def rango_variacion(elementos, n):
+    """
+    Índice (perfecto y mínimo) de un arreglo ordenado de elementos distintos
+    de range(n), en orden lexicográfico. Con k = n es el código de Lehmer
+    de una permutación.
+
+    @param elementos: Una secuencia de k enteros distintos en range(n).
+    @param n: El tamaño del universo.
+    @return: Un entero en range(num_variaciones(n, k)).
+
+    """
+    rango, usados = 0, 0
+    for i, x in enumerate(elementos):
+        rango = rango * (n - i) + x - (usados & ((1 << x) - 1)).bit_count()
+        usados |= 1 << x
+    return rango
+
+
+def variacion_de_rango(rango, n, k):
+    """
+    Inversa de rango_variacion.
+
+    @return: Una lista de k enteros distintos en range(n).
+
+    """
+    digitos = []
+    for i in range(k - 1, -1, -1):
+        rango, d = divmod(rango, n - i)
+        digitos.append(d)
+    digitos.reverse()
+    libres = list(range(n))
+    return [libres.pop(d) for d in digitos]
+
+
+def paridad_permutacion(permutacion):
+    """
+    Paridad de una permutación de range(n) en tiempo lineal, contando
+    sus ciclos.
+
+    @return: 0 si es par, 1 si es impar.
+
+    """
+    visitados = [False] * len(permutacion)
+    ciclos = 0
+    for i in range(len(permutacion)):
+        if not visitados[i]:
+            ciclos += 1
+            while not visitados[i]:
+                visitados[i] = True
+                i = permutacion[i]
+    return (len(permutacion) - ciclos) % 2
+
+
+class TablaPatrones:
+    """
+    Tabla de distancias empacada a 4 u 8 bits por entrada.
+
+    Las distancias que no caben en los bits disponibles se guardan como
+    el máximo representable, lo que sigue siendo una cota inferior.
+
+    """
+    def __init__(self, datos, tam, bits=4):
+        self.datos = datos
+        self.tam = tam
+        self.bits = bits
+
+    @staticmethod
+    def _bytes_datos(tam, bits):
+        return (tam + 1) // 2 if bits == 4 else tam
+
+    @classmethod
+    def desde_distancias(cls, distancias, bits=4):
+        """
+        Empaca una secuencia de distancias (una por entrada) en una tabla.
+
+        """
+        if bits not in (4, 8):
+            raise ValueError("Solo se soportan tablas de 4 u 8 bits.")
+        tam, maximo = len(distancias), (1 << bits) - 1
+        datos = bytearray(_ENCABEZADO + cls._bytes_datos(tam, bits))
+        datos[:_ENCABEZADO] = _MAGICO + bytes([bits]) + bytes(3) + tam.to_bytes(8, 'little')
+        if bits == 8:
+            datos[_ENCABEZADO:] = bytes(min(d, maximo) for d in distancias)
+        else:
+            for i in range(0, tam, 2):
+                bajo = min(distancias[i], maximo)
+                alto = min(distancias[i + 1], maximo) if i + 1 < tam else 0
+                datos[_ENCABEZADO + (i >> 1)] = bajo | (alto << 4)
+        return cls(datos, tam, bits)
+
+    @classmethod
+    def carga(cls, ruta):
+        """
+        Carga una tabla guardada con guarda(), mapeando el archivo en
+        memoria de solo lectura (compartida entre procesos).
+
+        """
+        with open(ruta, 'rb') as archivo:
+            datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if datos[:4] != _MAGICO:
+            raise ValueError(f"{ruta} no es una tabla de patrones.")
+        bits = datos[4]
+        tam = int.from_bytes(datos[8:_ENCABEZADO], 'little')
+        return cls(datos, tam, bits)
+
+    def guarda(self, ruta):
+        """
+        Guarda la tabla en disco (de forma atómica).
+
+        """
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(self.datos)
+        os.replace(temporal, ruta)
+
+    def __len__(self):
+        return self.tam
+
+    def __getitem__(self, i):
+        if self.bits == 8:
+            return self.datos[_ENCABEZADO + i]
+        byte = self.datos[_ENCABEZADO + (i >> 1)]
+        return byte >> 4 if i & 1 else byte & 15
+
+
+def distancias_bfs(num_estados, iniciales, vecinos):
+    """
+    Búsqueda a lo ancho por capas sobre estados indexados por enteros.
+
+    Como en los problemas que nos interesan toda acción tiene inversa,
+    buscar desde la meta da la distancia *hacia* la meta (búsqueda
+    retrógrada).
+
+    @param num_estados: Número de índices posibles.
+    @param iniciales: Índices de los estados a distancia 0.
+    @param vecinos: Función vecinos(indice) que regresa los índices vecinos.
+    @return: Un bytearray con la distancia de cada índice (255 si no es
+             alcanzable o si la distancia es mayor a 254).
+
+    """
+    distancias = bytearray(b'\xff') * num_estados
+    capa = list(set(iniciales))
+    for i in capa:
+        distancias[i] = 0
+    nivel = 0
+    while capa and nivel < 254:
+        nivel += 1
+        siguiente = []
+        for i in capa:
+            for j in vecinos(i):
+                if distancias[j] == 255:
+                    distancias[j] = nivel
+                    siguiente.append(j)
+        capa = siguiente
+    return distancias
+
+
+def obten_tabla(nombre, construye, directorio=None):
+    """
+    Carga una tabla de disco, construyéndola y guardándola si no existe.
+
+    @param nombre: Nombre del archivo de la tabla.
+    @param construye: Función sin argumentos que regresa una TablaPatrones.
+    @param directorio: Directorio de las tablas (DIRECTORIO_TABLAS por omisión).
+    @return: La TablaPatrones cargada con mmap.
+
+    """
+    ruta = os.path.join(directorio or DIRECTORIO_TABLAS, nombre)
+    if not os.path.exists(ruta):
+        construye().guarda(ruta)
+    return TablaPatrones.carga(ruta)
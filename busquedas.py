@@ -9,8 +9,20 @@ búsquedas en entornos determinísticos conocidos discretos
 completamente observables
 
 """
+import asyncio
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import heapq
+import os
+import tempfile
+import threading
+from time import perf_counter
+
+try:
+    import numpy as np
+except ImportError:  # El camino por lotes es opcional
+    np = None
 
 
 class ProblemaBusqueda:
@@ -23,10 +35,25 @@ class ProblemaBusqueda:
         3) Una función de costo local
 
     """
+    # Si es True, las búsquedas llaman acciones(estado, accion_previa)
+    usa_accion_previa = False
+    # Si es False, las búsquedas no usan canonico aunque esté implementado
+    usa_simetrias = True
+    # Si es False, las búsquedas no llaman es_resoluble antes de empezar
+    verifica_resoluble = True
+
     def acciones(self, estado):
         """
         Lista de acciones legales en un estado dado.
 
+        Si el problema pone usa_accion_previa = True, el método recibe
+        además accion_previa, la acción con la que se llegó al estado (None
+        en el estado inicial), y puede omitir las acciones que forman
+        secuencias redundantes: deshacer la acción anterior, o los dos
+        órdenes de dos acciones que conmutan. Las búsquedas por estados
+        (como las bidireccionales) lo llaman sin accion_previa, así que
+        el parámetro debe ser opcional.
+
         @param estado: Una tupla con un estado válido.
         @return: Una lista de acciones legales.
 
@@ -56,12 +83,145 @@ class ProblemaBusqueda:
         """
         raise NotImplementedError("No implementado todavía el método terminal.")
 
+    def es_resoluble(self, estado):
+        """
+        Revisa un invariante barato que indique si desde estado se puede
+        llegar a la meta (opcional).
+
+        Todas las búsquedas lo llaman con el estado inicial antes de
+        empezar, y si regresa False terminan de inmediato con
+        'sin solucion' en lugar de recorrer todo el espacio alcanzable
+        (salvo con verifica_resoluble = False, por ejemplo para recorrer
+        a propósito todo el espacio con una meta imposible). Por omisión
+        no se descarta ningún estado.
+
+        @param estado: Una tupla con un estado.
+        @return: False solo si es seguro que no hay solución.
+
+        """
+        return True
+
+    def accion_inversa(self, accion):
+        """
+        Acción que deshace a otra (opcional, para problemas invertibles).
+
+        @param accion: Una acción legal.
+        @return: La acción que regresa al estado anterior a aplicar accion.
+
+        """
+        raise NotImplementedError("No implementado todavía el método accion_inversa.")
+
+    def predecesores(self, estado):
+        """
+        Estados desde los cuales se llega a estado con una sola acción.
+
+        Por omisión se obtienen con accion_inversa, por lo que solo sirve
+        para problemas donde toda acción se puede deshacer. Los problemas
+        que no son invertibles pueden sobrecargar este método.
+
+        @param estado: Una tupla con un estado válido.
+        @return: Un iterable de tuplas (estado_previo, accion, costo_local) tales
+                 que sucesor(estado_previo, accion) == (estado, costo_local).
+
+        """
+        for accion in self.acciones(estado):
+            previo, _ = self.sucesor(estado, accion)
+            inversa = self.accion_inversa(accion)
+            _, costo_local = self.sucesor(previo, inversa)
+            yield previo, inversa, costo_local
+
+    def estados_meta(self):
+        """
+        Lista explícita de estados meta (opcional, para búsquedas bidireccionales).
+
+        @return: Un iterable con los estados terminales del problema.
+
+        """
+        raise NotImplementedError("No implementado todavía el método estados_meta.")
+
+    def codifica(self, estado):
+        """
+        Código entero de un estado (opcional).
+
+        Si el problema lo implementa, las búsquedas guardan los estados
+        visitados por su código en lugar de por la tupla completa, lo que
+        ahorra memoria y hace más rápido el hash.
+
+        @param estado: Una tupla con un estado válido.
+        @return: Un entero no negativo, distinto para cada estado.
+
+        """
+        raise NotImplementedError("No implementado todavía el método codifica.")
+
+    def decodifica(self, codigo):
+        """
+        Inversa de codifica.
+
+        @param codigo: Un entero regresado por codifica.
+        @return: El estado con ese código.
+
+        """
+        raise NotImplementedError("No implementado todavía el método decodifica.")
+
+    def num_codigos(self):
+        """
+        Cota de los códigos (opcional, para tablas indexadas por codifica).
+
+        @return: Un entero n tal que codifica(estado) está en range(n) para
+                 todo estado válido.
+
+        """
+        raise NotImplementedError("No implementado todavía el método num_codigos.")
+
+    def canonico(self, estado):
+        """
+        Representante canónico de la clase de simetría de un estado (opcional).
+
+        Dos estados son simétricos si una simetría del problema (por
+        ejemplo girar o reflejar el cubo y renombrar los colores) lleva uno
+        en el otro y deja fija la meta, así que los dos están a la misma
+        distancia de ella. Si el problema lo implementa, las búsquedas
+        detectan repetidos por el representante (compuesto con codifica, si
+        existe) y guardan un solo estado de cada clase, pero siempre
+        expanden estados reales, de modo que los planes no cambian.
+        Conviene cuando el representante es barato o cuando la búsqueda
+        encuentra muchos estados simétricos (por ejemplo si parte de la
+        meta); si no, se puede apagar con usa_simetrias = False.
+
+        @param estado: Una tupla con un estado válido.
+        @return: El mismo estado para todos los estados de la clase.
+
+        """
+        raise NotImplementedError("No implementado todavía el método canonico.")
+
+    def sucesores_lote(self, estados):
+        """
+        Expande muchos estados a la vez (opcional, requiere numpy).
+
+        Si el problema lo implementa, la heurística tiene un atributo lote
+        y se pide lote=True (ver busqueda_A_estrella), A* expande y evalúa
+        a todos los hijos de varios nodos con una sola llamada.
+
+        @param estados: Un arreglo de numpy de m x L, un estado por renglón.
+        @return: hijos, padres, acciones, costos. Un arreglo k x L con los
+                 estados sucesores, un arreglo con el renglón del padre de
+                 cada hijo, una lista con la acción que produjo cada hijo y
+                 un arreglo con los costos locales.
+
+        """
+        raise NotImplementedError("No implementado todavía el método sucesores_lote.")
+
 
 class NodoBusqueda:
     """
     Clase para implementar un árbol como estructura de datos.
 
+    Se crean millones de nodos en una búsqueda, así que se usan __slots__
+    (sin __dict__ por nodo) para ahorrar memoria y tiempo de creación.
+
     """
+    __slots__ = ('estado', 'accion', 'padre', 'costo', 'profundidad', 'h')
+
     def __init__(self, estado, accion=None, padre=None, costo_local=0):
         """
         Inicializa un nodo como una estructura
@@ -70,8 +230,12 @@ class NodoBusqueda:
         self.estado = estado
         self.accion = accion
         self.padre = padre
-        self.costo = 0 if not padre else padre.costo + costo_local
-        self.profundidad = 0 if not padre else padre.profundidad + 1
+        if padre is None:
+            self.costo, self.profundidad = 0, 0
+        else:
+            self.costo = padre.costo + costo_local
+            self.profundidad = padre.profundidad + 1
+        self.h = None  # Valor de la heurística, si la búsqueda lo calcula
 
     def expande(self, pb_busqueda):
         """
@@ -81,7 +245,11 @@ class NodoBusqueda:
         @return: Un generador de posibles nodos sucesores
 
         """
-        for a in pb_busqueda.acciones(self.estado):
+        if pb_busqueda.usa_accion_previa:
+            acciones = pb_busqueda.acciones(self.estado, self.accion)
+        else:
+            acciones = pb_busqueda.acciones(self.estado)
+        for a in acciones:
             estado_sucesor, costo_local = pb_busqueda.sucesor(self.estado, a)
             yield NodoBusqueda(
                 estado_sucesor,
@@ -100,11 +268,15 @@ class NodoBusqueda:
                     acción ni costo asociado. 
 
         """
-        return (
-            [(self.estado, None, None)] if self.padre is None else
-             self.padre.genera_plan()[:-1] + [(self.padre.estado, self.accion, self.costo), 
-                                              (self.estado, None, None)]
-        )
+        # Se sube por los padres de forma iterativa (sin recursión y en
+        # tiempo lineal en la profundidad) y luego se invierte el camino.
+        plan = [(self.estado, None, None)]
+        nodo = self
+        while nodo.padre is not None:
+            plan.append((nodo.padre.estado, nodo.accion, nodo.costo))
+            nodo = nodo.padre
+        plan.reverse()
+        return plan
 
     def __str__(self):
         """
@@ -124,105 +296,585 @@ class NodoBusqueda:
         return self.profundidad < other.profundidad
 
 
-def busqueda_ancho(problema, s0):
+def _funcion_clave(problema, simetrias=True):
+    """
+    Función con la que las búsquedas identifican estados repetidos: el
+    código entero si el problema implementa codifica, o el estado mismo,
+    aplicados al representante canónico si implementa canonico.
+
+    @param simetrias: Si es False no se usa canonico (las búsquedas
+                      bidireccionales necesitan que los dos lados se
+                      encuentren en el mismo estado, no solo en la misma
+                      clase).
+
+    """
+    codifica = type(problema).codifica is not ProblemaBusqueda.codifica
+    canonico = (simetrias and problema.usa_simetrias and
+                type(problema).canonico is not ProblemaBusqueda.canonico)
+    if canonico and codifica:
+        codigo, representante = problema.codifica, problema.canonico
+        return lambda estado: codigo(representante(estado))
+    if canonico:
+        return problema.canonico
+    if codifica:
+        return problema.codifica
+    return lambda estado: estado
+
+
+class ColaPrioridad:
+    """
+    Frontera de las búsquedas de primero el mejor: un montículo de
+    entradas (prioridad, desempate, contador, elemento).
+
+    El contador de inserción hace que dos entradas nunca empaten, así que
+    los elementos (nodos) nunca se comparan entre sí, y además define el
+    orden entre entradas con la misma prioridad y el mismo desempate
+    (FIFO, o LIFO si lifo=True).
+
+    Las búsquedas usan eliminación perezosa: cuando se mejora el costo de
+    un estado se agrega una entrada nueva y la vieja se descarta al
+    sacarla. El atributo obsoletas cuenta esas entradas descartadas.
+
+    """
+    def __init__(self, lifo=False):
+        self.datos = []
+        self.paso = -1 if lifo else 1
+        self.contador = 0
+        self.obsoletas = 0
+
+    def agrega(self, prioridad, desempate, elemento):
+        self.contador += self.paso
+        heapq.heappush(self.datos, (prioridad, desempate, self.contador, elemento))
+
+    def tope(self):
+        "Prioridad mínima en la cola"
+        return self.datos[0][0]
+
+    def saca(self):
+        "Saca el elemento de prioridad mínima y regresa (prioridad, elemento)"
+        entrada = heapq.heappop(self.datos)
+        return entrada[0], entrada[3]
+
+    def descarta(self):
+        "Registra que la última entrada sacada era obsoleta"
+        self.obsoletas += 1
+
+    def elementos(self):
+        "Los elementos en la cola, en cualquier orden"
+        return (entrada[3] for entrada in self.datos)
+
+    def __len__(self):
+        return len(self.datos)
+
+
+class ColaCubetas(ColaPrioridad):
+    """
+    Cola de cubetas para prioridades enteras no negativas y pequeñas (por
+    ejemplo costos unitarios): una lista indexada por la prioridad, donde
+    cada cubeta es un montículo por (desempate, contador). Como la
+    prioridad mínima en A* con heurística consistente y en costo uniforme
+    nunca baja, sacar y meter cuesta O(1) amortizado más el montículo de
+    una sola cubeta, que suele ser chico.
+
+    """
+    def __init__(self, lifo=False):
+        super().__init__(lifo)
+        self.cubetas = []
+        self.minimo = 0
+        self.tam = 0
+
+    def agrega(self, prioridad, desempate, elemento):
+        if prioridad != int(prioridad) or prioridad < 0:
+            raise ValueError("La cola de cubetas solo acepta prioridades enteras no negativas.")
+        prioridad = int(prioridad)
+        while len(self.cubetas) <= prioridad:
+            self.cubetas.append([])
+        self.contador += self.paso
+        heapq.heappush(self.cubetas[prioridad], (desempate, self.contador, elemento))
+        self.minimo = min(self.minimo, prioridad)
+        self.tam += 1
+
+    def tope(self):
+        while not self.cubetas[self.minimo]:
+            self.minimo += 1
+        return self.minimo
+
+    def saca(self):
+        prioridad = self.tope()
+        self.tam -= 1
+        return prioridad, heapq.heappop(self.cubetas[prioridad])[2]
+
+    def elementos(self):
+        return (entrada[2] for cubeta in self.cubetas for entrada in cubeta)
+
+    def __len__(self):
+        return self.tam
+
+
+_DESEMPATES = {
+    # Entre nodos con el mismo f, primero el más profundo (menor h), y
+    # entre esos el último en entrar: en A* esto llega a la meta sin
+    # expandir toda la última capa de f.
+    'profundo': (lambda nodo: -nodo.costo, True),
+    'h': (lambda nodo: nodo.h, False),
+    'fifo': (None, False),
+    'lifo': (None, True),
+}
+
+
+def _prepara_cola(desempate, cola):
+    """
+    Resuelve los parámetros desempate y cola de las búsquedas de primero
+    el mejor.
+
+    @param desempate: 'profundo', 'h', 'fifo', 'lifo' o una función
+                      desempate(nodo) que regresa un valor comparable.
+    @param cola: None o 'monticulo' (ColaPrioridad), 'cubetas'
+                 (ColaCubetas), o un objeto cola ya construido.
+    @return: secundaria, cola; secundaria es una función de nodo o None.
+
+    """
+    if callable(desempate):
+        secundaria, lifo = desempate, False
+    elif desempate in _DESEMPATES:
+        secundaria, lifo = _DESEMPATES[desempate]
+    else:
+        raise ValueError(f"Desempate desconocido: {desempate!r}")
+    if cola is None or cola == 'monticulo':
+        cola = ColaPrioridad(lifo)
+    elif cola == 'cubetas':
+        cola = ColaCubetas(lifo)
+    return secundaria, cola
+
+
+class EstadisticasBusqueda:
+    """
+    Contadores comunes a todas las búsquedas.
+
+    Se pasa como estadisticas=... a cualquier busqueda_*, que va
+    actualizando los contadores mientras avanza (si el mismo objeto se
+    usa en varias búsquedas, los contadores se acumulan):
+
+        generados:     nodos (o estados) sucesores creados.
+        expandidos:    nodos sacados de la frontera para expandirse; es el
+                       mismo número que regresan las búsquedas como
+                       nodos_visitados.
+        duplicados:    sucesores descartados por ya haberse visto con un
+                       costo igual o menor (o por estar en el camino, en IDA*).
+        obsoletas:     entradas sacadas de la frontera cuyo costo ya se
+                       había mejorado (eliminación perezosa).
+        max_frontera:  tamaño máximo de la frontera (de la pila en IDA*).
+        max_visitados: tamaño máximo de la tabla de visitados (del camino
+                       en IDA*).
+
+    Si medir_tiempos es True, además se acumula en tiempos el tiempo en
+    segundos que se pasa en problema.acciones, problema.sucesor (y
+    sucesores_lote), problema.terminal, problema.predecesores y en la
+    heurística (y su delta o lote). Medir cuesta una llamada extra por
+    función, así que está apagado por omisión.
+
+    on_expand y on_generate son funciones opcionales f(estado, costo) que
+    se llaman al expandir y al generar cada estado; costo es la g del nodo
+    (en las búsquedas bidireccionales, la del lado que lo generó).
+
+    """
+    def __init__(self, medir_tiempos=False, on_expand=None, on_generate=None):
+        self.generados = 0
+        self.expandidos = 0
+        self.duplicados = 0
+        self.obsoletas = 0
+        self.max_frontera = 0
+        self.max_visitados = 0
+        self.medir_tiempos = medir_tiempos
+        self.tiempos = dict.fromkeys(('acciones', 'sucesor', 'terminal',
+                                      'predecesores', 'heuristica'), 0.0)
+        self.on_expand = on_expand
+        self.on_generate = on_generate
+
+    def tamanos(self, frontera, visitados):
+        "Actualiza los máximos de frontera y visitados"
+        if frontera > self.max_frontera:
+            self.max_frontera = frontera
+        if visitados > self.max_visitados:
+            self.max_visitados = visitados
+
+    def instrumenta(self, problema, heuristica=None):
+        """
+        Regresa el problema y la heurística que debe usar la búsqueda: los
+        mismos, o envolturas que miden el tiempo si medir_tiempos es True.
+
+        """
+        if not self.medir_tiempos:
+            return problema, heuristica
+        if heuristica is not None:
+            medida = _medida(heuristica, self.tiempos, 'heuristica')
+            for atributo in ('delta', 'lote'):
+                if hasattr(heuristica, atributo):
+                    setattr(medida, atributo,
+                            _medida(getattr(heuristica, atributo), self.tiempos, 'heuristica'))
+            heuristica = medida
+        return _ProblemaMedido(problema, self.tiempos), heuristica
+
+    def como_dict(self):
+        return {'generados': self.generados, 'expandidos': self.expandidos,
+                'duplicados': self.duplicados, 'obsoletas': self.obsoletas,
+                'max_frontera': self.max_frontera, 'max_visitados': self.max_visitados,
+                'tiempos': dict(self.tiempos)}
+
+    def __str__(self):
+        cadena = (f"Generados: {self.generados}\n" +
+                  f"Expandidos: {self.expandidos}\n" +
+                  f"Duplicados: {self.duplicados}\n" +
+                  f"Obsoletas: {self.obsoletas}\n" +
+                  f"Frontera máxima: {self.max_frontera}\n" +
+                  f"Visitados máximo: {self.max_visitados}")
+        if self.medir_tiempos:
+            cadena += "".join(f"\nTiempo en {nombre}: {t:.4f} s"
+                              for nombre, t in self.tiempos.items())
+        return cadena
+
+
+def _medida(funcion, tiempos, nombre):
+    "Envuelve funcion para acumular su tiempo en tiempos[nombre]"
+    def medida(*args):
+        inicio = perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            tiempos[nombre] += perf_counter() - inicio
+    return medida
+
+
+class _ProblemaMedido:
+    """
+    Envoltura de un problema que mide el tiempo de sus métodos; el resto
+    de los atributos se toman del problema original.
+
+    """
+    _MEDIDOS = {'acciones': 'acciones', 'sucesor': 'sucesor', 'sucesores_lote': 'sucesor',
+                'terminal': 'terminal', 'predecesores': 'predecesores'}
+
+    def __init__(self, problema, tiempos):
+        self.problema = problema
+        for metodo, nombre in self._MEDIDOS.items():
+            setattr(self, metodo, _medida(getattr(problema, metodo), tiempos, nombre))
+
+    def __getattr__(self, atributo):
+        return getattr(self.problema, atributo)
+
+
+class ResultadoBusqueda(tuple):
+    """
+    Resultado de una búsqueda.
+
+    Se desempaca como antes, nodo, nodos_visitados = busqueda(...), y
+    además tiene los atributos:
+
+        nodo:            El nodo con el plan completo, o None.
+        nodos_visitados: Número de nodos expandidos.
+        estado:          'resuelto', 'sin solucion' (se agotó el espacio),
+                         'max_nodos', 'max_segundos' o 'cancelada'.
+        mejor:           El nodo más prometedor alcanzado: el plan si se
+                         resolvió y, si se interrumpió, el nodo de la
+                         frontera con menor h (o mayor g si la búsqueda no
+                         usa heurística).
+        estadisticas:    El EstadisticasBusqueda de la búsqueda.
+
+    """
+    def __new__(cls, nodo, nodos_visitados, estado, mejor=None, estadisticas=None):
+        resultado = super().__new__(cls, (nodo, nodos_visitados))
+        resultado.estado = estado
+        resultado.mejor = mejor
+        resultado.estadisticas = estadisticas
+        return resultado
+
+    def __reduce__(self):
+        return ResultadoBusqueda, (self[0], self[1], self.estado, self.mejor, self.estadisticas)
+
+    @property
+    def nodo(self):
+        return self[0]
+
+    @property
+    def nodos_visitados(self):
+        return self[1]
+
+
+def _resultado(nodo, nodos_visitados, estadisticas):
+    "Resultado de una búsqueda que terminó (con o sin plan)"
+    return ResultadoBusqueda(nodo, nodos_visitados,
+                             'resuelto' if nodo is not None else 'sin solucion', nodo, estadisticas)
+
+
+def _interrumpida(razon, nodos_visitados, estadisticas, candidatos=()):
+    "Resultado de una búsqueda que se quedó sin presupuesto o se canceló"
+    mejor = min(candidatos, key=lambda nodo: (nodo.h or 0, -nodo.costo), default=None)
+    return ResultadoBusqueda(None, nodos_visitados, razon, mejor, estadisticas)
+
+
+class _Presupuesto:
+    """
+    Límites de una búsqueda: nodos expandidos, segundos y cancelación, y
+    cada cuántos nodos hace una pausa la versión por pasos.
+
+    El reloj y la cancelación solo se revisan cada 256 llamadas, para no
+    agregar costo por nodo.
+
+    """
+    def __init__(self, max_nodos, max_segundos, cancelacion, nodos_por_paso=None):
+        self.max_nodos = max_nodos
+        self.limite = None if max_segundos is None else perf_counter() + max_segundos
+        self.cancelacion = cancelacion
+        self.llamadas = 0
+        self.nodos_por_paso = nodos_por_paso
+        self.siguiente_pausa = nodos_por_paso
+
+    @classmethod
+    def crea(cls, max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+        "Un _Presupuesto, o None si no hay ningún límite ni pausas"
+        if (max_nodos is None and max_segundos is None and cancelacion is None and
+                nodos_por_paso is None):
+            return None
+        return cls(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+
+    def agotado(self, nodos_visitados, siempre=False):
+        """
+        @param siempre: Revisar el reloj y la cancelación en esta llamada
+                        (para búsquedas que hacen mucho trabajo por llamada).
+        @return: None si se puede seguir, o la razón para detenerse
+                 ('max_nodos', 'max_segundos' o 'cancelada').
+
+        """
+        if self.max_nodos is not None and nodos_visitados >= self.max_nodos:
+            return 'max_nodos'
+        self.llamadas += 1
+        if self.llamadas & 255 != 1 and not siempre:
+            return None
+        if self.limite is not None and perf_counter() >= self.limite:
+            return 'max_segundos'
+        if self.cancelacion is not None and self.cancelacion.is_set():
+            return 'cancelada'
+        return None
+
+    def pausa(self, nodos_visitados):
+        "True si la versión por pasos debe ceder el control ahora"
+        if self.nodos_por_paso is None or nodos_visitados < self.siguiente_pausa:
+            return False
+        self.siguiente_pausa = nodos_visitados + self.nodos_por_paso
+        return True
+
+
+def _ejecuta(pasos):
+    "Corre hasta el final la versión por pasos de una búsqueda y regresa su resultado"
+    try:
+        while True:
+            next(pasos)
+    except StopIteration as fin:
+        return fin.value
+
+
+def busqueda_ancho(problema, s0, estadisticas=None,
+                   max_nodos=None, max_segundos=None, cancelacion=None):
     """
     Búsqueda a lo ancho para un problema de búsquedas dado
 
     @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
 
-    @return Un objeto tipo Nodo con un plan completo
+    @return Un objeto tipo Nodo con un plan completo (dentro de un
+            ResultadoBusqueda, que se desempaca como nodo, nodos_visitados)
 
     """
-    nodos_visitados = 1
+    return _ejecuta(_pasos_ancho(problema, s0, estadisticas, max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_ancho(problema, s0, estadisticas=None,
+                 max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_ancho (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    clave = _funcion_clave(problema)
+    problema, _ = est.instrumenta(problema)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    nodos_visitados = 0
     if problema.terminal(s0):
-        return NodoBusqueda(s0)
+        return _resultado(NodoBusqueda(s0), nodos_visitados, est)
 
     frontera = deque([NodoBusqueda(s0)])
-    estados_visitados = {s0}
+    estados_visitados = {clave(s0)}
 
     while frontera:
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados)
+            if razon:
+                return _interrumpida(razon, nodos_visitados, est, frontera)
+            if presupuesto.pausa(nodos_visitados):
+                yield est
         plan = frontera.popleft()
+        nodos_visitados += 1
+        est.expandidos += 1
+        if on_expand is not None:
+            on_expand(plan.estado, plan.costo)
         for hijo in plan.expande(problema):
-            if hijo.estado in estados_visitados:
+            est.generados += 1
+            llave = clave(hijo.estado)
+            if llave in estados_visitados:
+                est.duplicados += 1
                 continue
-            nodos_visitados += 1
+            if on_generate is not None:
+                on_generate(hijo.estado, hijo.costo)
             if problema.terminal(hijo.estado):
-                return hijo, nodos_visitados
+                return _resultado(hijo, nodos_visitados, est)
             frontera.append(hijo)
-            estados_visitados.add(hijo.estado)
-    return None, nodos_visitados
+            estados_visitados.add(llave)
+        est.tamanos(len(frontera), len(estados_visitados))
+    return _resultado(None, nodos_visitados, est)
 
 
-def busqueda_profundo(problema, s0, max_profundidad=None):
+def busqueda_profundo(problema, s0, max_profundidad=None, estadisticas=None,
+                      max_nodos=None, max_segundos=None, cancelacion=None):
     """
     Búsqueda a lo profundo para un problema de búsquedas dado
 
     @param problema: Un objeto de una clase heredada de ProblemaBusqueda
     @param max_profundidad: Máxima profundidad de búsqueda
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
 
-    @return Un objeto tipo Nodo con la estructura completa
+    @return Un objeto tipo Nodo con la estructura completa (dentro de un
+            ResultadoBusqueda)
 
     """
+    return _ejecuta(_pasos_profundo(problema, s0, max_profundidad, estadisticas, max_nodos,
+                                    max_segundos, cancelacion))
+
+
+def _pasos_profundo(problema, s0, max_profundidad=None, estadisticas=None,
+                    max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_profundo (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    clave = _funcion_clave(problema)
+    problema, _ = est.instrumenta(problema)
+    on_expand, on_generate = est.on_expand, est.on_generate
     frontera = deque([NodoBusqueda(s0)])
-    visitados = {s0: 0}
+    visitados = {clave(s0): 0}
     nodos_visitados = 0
 
     while frontera:
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados)
+            if razon:
+                return _interrumpida(razon, nodos_visitados, est, frontera)
+            if presupuesto.pausa(nodos_visitados):
+                yield est
         plan = frontera.pop()
         nodos_visitados += 1
+        est.expandidos += 1
+        if on_expand is not None:
+            on_expand(plan.estado, plan.costo)
         if problema.terminal(plan.estado):
-            return plan, nodos_visitados
+            return _resultado(plan, nodos_visitados, est)
         if max_profundidad is not None and max_profundidad == plan.profundidad:
             continue
         for hijo in plan.expande(problema):
-            if hijo.estado not in visitados or visitados[hijo.estado] > hijo.profundidad:
+            est.generados += 1
+            llave = clave(hijo.estado)
+            if llave not in visitados or visitados[llave] > hijo.profundidad:
+                if on_generate is not None:
+                    on_generate(hijo.estado, hijo.costo)
                 frontera.append(hijo)
-                visitados[hijo.estado] = hijo.profundidad
-    return None, nodos_visitados
+                visitados[llave] = hijo.profundidad
+            else:
+                est.duplicados += 1
+        est.tamanos(len(frontera), len(visitados))
+    return _resultado(None, nodos_visitados, est)
 
 
-def busqueda_profundidad_iterativa(problema, s0, max_profundidad=20):
+def busqueda_profundidad_iterativa(problema, s0, max_profundidad=20, estadisticas=None,
+                                   max_nodos=None, max_segundos=None, cancelacion=None):
     """
     Búsqueda por profundidad iterativa dado
 
     @param problema: Un objeto de una clase heredada de ProblemaBusqueda
     @param max_profundidad: Máxima profundidad de búsqueda
-    @return Un objeto tipo Nodo con la estructura completa
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar
+                         (acumula todas las iteraciones).
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+                        Los límites son para el total de las iteraciones.
+    @return Un objeto tipo Nodo con la estructura completa (dentro de un
+            ResultadoBusqueda)
 
     """
+    return _ejecuta(_pasos_profundidad_iterativa(problema, s0, max_profundidad, estadisticas,
+                                                 max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_profundidad_iterativa(problema, s0, max_profundidad=20, estadisticas=None,
+                                 max_nodos=None, max_segundos=None, cancelacion=None,
+                                 nodos_por_paso=None):
+    "Versión por pasos de busqueda_profundidad_iterativa (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    limite = None if max_segundos is None else perf_counter() + max_segundos
     nodos_visitados = 0
     for profundidad in range(1, max_profundidad + 1):
-        plan, nodos = busqueda_profundo(problema, s0, profundidad)
-        nodos_visitados += nodos
-        if plan is not None:
-            return plan, nodos_visitados
-    return None, nodos_visitados
+        resultado = yield from _pasos_profundo(
+            problema, s0, profundidad, est,
+            None if max_nodos is None else max_nodos - nodos_visitados,
+            None if limite is None else limite - perf_counter(), cancelacion, nodos_por_paso)
+        nodos_visitados += resultado.nodos_visitados
+        if resultado.estado not in ('resuelto', 'sin solucion'):
+            return ResultadoBusqueda(None, nodos_visitados, resultado.estado, resultado.mejor, est)
+        if resultado.nodo is not None:
+            return _resultado(resultado.nodo, nodos_visitados, est)
+    return _resultado(None, nodos_visitados, est)
 
 
-def busqueda_costo_uniforme(problema, s0):
+def busqueda_costo_uniforme(problema, s0, desempate='fifo', cola=None, estadisticas=None,
+                            max_nodos=None, max_segundos=None, cancelacion=None):
     """
     Búsqueda por costo uniforme
 
     @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+    @param desempate: Orden entre nodos con el mismo costo (ver _prepara_cola).
+    @param cola: Frontera a usar; 'cubetas' conviene con costos enteros.
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
 
-    @return Un objeto tipo Nodo con la estructura completa
+    @return Un objeto tipo Nodo con la estructura completa (dentro de un
+            ResultadoBusqueda)
 
     """
-    frontera = []
-    heapq.heappush(frontera, (0, NodoBusqueda(s0)))
-    visitados = {s0: 0}
-    nodos_visitados = 0
+    return _ejecuta(_pasos_costo_uniforme(problema, s0, desempate, cola, estadisticas,
+                                          max_nodos, max_segundos, cancelacion))
 
-    while frontera:
-        _, plan = heapq.heappop(frontera)
-        nodos_visitados += 1
-        if problema.terminal(plan.estado):
-            return plan, nodos_visitados
-        for hijo in plan.expande(problema):
-            if (hijo.estado not in visitados or visitados[hijo.estado] > hijo.costo):
-                heapq.heappush(frontera, (hijo.costo, hijo))
-                visitados[hijo.estado] = hijo.costo
-    return None, nodos_visitados
+
+def _pasos_costo_uniforme(problema, s0, desempate='fifo', cola=None, estadisticas=None,
+                          max_nodos=None, max_segundos=None, cancelacion=None,
+                          nodos_por_paso=None):
+    "Versión por pasos de busqueda_costo_uniforme (ver busqueda_por_pasos)"
+    return (yield from _busqueda_primero_mejor(
+        problema, s0, None, desempate, cola, estadisticas, 1,
+        _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)))
 
 # ---------------------------------------------------------------------
 #
@@ -235,7 +887,9 @@ def busqueda_costo_uniforme(problema, s0):
 # ---------------------------------------------------------------------
 
 
-def busqueda_A_estrella(problema, s0, heuristica):
+def busqueda_A_estrella(problema, s0, heuristica, tam_lote=256,
+                        desempate='profundo', cola=None, estadisticas=None, peso=1, lote=False,
+                        max_nodos=None, max_segundos=None, cancelacion=None):
     """
     Búsqueda A*
 
@@ -243,33 +897,1499 @@ def busqueda_A_estrella(problema, s0, heuristica):
     @param heuristica: Una funcion de heuristica, esto es, una función
                        heuristica(nodo), la cual devuelva un número mayor
                        o igual a cero con el costo esperado desde nodo hasta
-                       un nodo cuyo estado final sea méta.
+                       un nodo cuyo estado final sea méta. Si además tiene
+                       un atributo delta(h_padre, estado_padre, accion, estado_hijo),
+                       la h de cada hijo se actualiza a partir de la del
+                       padre en lugar de calcularse desde cero.
     @param estado inicial: El estado inicial del problema.
+    @param tam_lote: Máximo de nodos empatados en f que se expanden juntos
+                     con lote=True.
+    @param desempate: Orden entre nodos con el mismo f: 'profundo' (mayor g
+                      primero, por omisión), 'h' (menor h primero), 'fifo',
+                      'lifo' o una función desempate(nodo).
+    @param cola: Frontera a usar: None o 'monticulo', 'cubetas' (para f
+                 enteros pequeños) o un objeto como ColaPrioridad, cuyo
+                 atributo obsoletas queda disponible al terminar.
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param peso: Con peso > 1 se hace A* ponderado, con f = g + peso * h:
+                 se expanden muchos menos nodos y, si h es admisible, el
+                 costo del plan es a lo más peso veces el óptimo.
+    @param lote: Si es True, el problema implementa sucesores_lote, la
+                 heurística tiene una versión vectorizada
+                 heuristica.lote(estados) que regresa un arreglo con h para
+                 cada renglón y numpy está instalado, los nodos empatados en
+                 f se expanden y evalúan juntos (ver
+                 _busqueda_A_estrella_lote). Esta versión no usa
+                 heuristica.delta ni la acción previa, así que puede
+                 expandir más nodos; si falta algo se usa la normal.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return Un objeto tipo Nodo con la estructura completa (dentro de un
+            ResultadoBusqueda, que se desempaca como nodo, nodos_visitados)
+    """
+    return _ejecuta(_pasos_A_estrella(problema, s0, heuristica, tam_lote, desempate, cola,
+                                      estadisticas, peso, lote, max_nodos, max_segundos,
+                                      cancelacion))
+
+
+def _pasos_A_estrella(problema, s0, heuristica, tam_lote=256,
+                      desempate='profundo', cola=None, estadisticas=None, peso=1, lote=False,
+                      max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_A_estrella (ver busqueda_por_pasos)"
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    if (lote and np is not None and hasattr(heuristica, 'lote') and
+            type(problema).sucesores_lote is not ProblemaBusqueda.sucesores_lote):
+        return (yield from _busqueda_A_estrella_lote(problema, s0, heuristica, tam_lote,
+                                                     desempate, cola, estadisticas, peso,
+                                                     presupuesto))
+    return (yield from _busqueda_primero_mejor(problema, s0, heuristica, desempate, cola,
+                                               estadisticas, peso, presupuesto))
+
+
+def _busqueda_primero_mejor(problema, s0, heuristica, desempate, cola, estadisticas, peso,
+                            presupuesto):
+    """
+    Núcleo común de costo uniforme (heuristica=None) y A*.
+
+    La frontera guarda (llave, nodo) con prioridad f = g + peso * h, y las
+    entradas cuyo costo ya se mejoró se descartan al sacarlas.
 
-    @return Un objeto tipo Nodo con la estructura completa
     """
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    clave = _funcion_clave(problema)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    secundaria, cola = _prepara_cola(desempate, cola)
+    delta = getattr(heuristica, 'delta', None)
     nodo_inicial = NodoBusqueda(s0)
-    f_n = nodo_inicial.costo + heuristica(nodo_inicial)
-    frontera = []
-    heapq.heappush(frontera, (f_n, nodo_inicial))
-    visitados = {s0: nodo_inicial.costo}
+    nodo_inicial.h = heuristica(nodo_inicial) if heuristica else 0
+    llave = clave(s0)
+    cola.agrega(nodo_inicial.costo + peso * nodo_inicial.h,
+                secundaria(nodo_inicial) if secundaria else 0, (llave, nodo_inicial))
+    visitados = {llave: nodo_inicial.costo}
     nodos_visitados = 0
 
-    while frontera:
-        f_n_actual, nodo = heapq.heappop(frontera)
-
-        if nodo.estado in visitados and visitados[nodo.estado] < nodo.costo:
+    while cola:
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados)
+            if razon:
+                return _interrumpida(razon, nodos_visitados, est,
+                                     (nodo for _, nodo in cola.elementos()))
+            if presupuesto.pausa(nodos_visitados):
+                yield est
+        _, (llave, nodo) = cola.saca()
+        if visitados[llave] < nodo.costo:
+            cola.descarta()
+            est.obsoletas += 1
             continue
 
         nodos_visitados += 1
+        est.expandidos += 1
+        if on_expand is not None:
+            on_expand(nodo.estado, nodo.costo)
         if problema.terminal(nodo.estado):
-            return nodo, nodos_visitados
+            return _resultado(nodo, nodos_visitados, est)
 
         for hijo in nodo.expande(problema):
-            if hijo.estado not in visitados or visitados[hijo.estado] > hijo.costo:
-                visitados[hijo.estado] = hijo.costo
+            est.generados += 1
+            llave = clave(hijo.estado)
+            if llave not in visitados or visitados[llave] > hijo.costo:
+                visitados[llave] = hijo.costo
+                if heuristica is None:
+                    hijo.h = 0
+                else:
+                    hijo.h = (delta(nodo.h, nodo.estado, hijo.accion, hijo.estado) if delta
+                              else heuristica(hijo))
+                if on_generate is not None:
+                    on_generate(hijo.estado, hijo.costo)
+                cola.agrega(hijo.costo + peso * hijo.h,
+                            secundaria(hijo) if secundaria else 0, (llave, hijo))
+            else:
+                est.duplicados += 1
+        est.tamanos(len(cola), len(visitados))
+
+    return _resultado(None, nodos_visitados, est)
+
+
+def _busqueda_A_estrella_lote(problema, s0, heuristica, tam_lote, desempate, cola, estadisticas,
+                              peso, presupuesto):
+    """
+    A* con expansión y evaluación por lotes.
+
+    Se sacan de la frontera hasta tam_lote nodos con el mismo f (el mínimo),
+    así que el orden de expansión y la optimalidad son los de A*, pero los
+    sucesores y sus heurísticas se calculan con una sola llamada a
+    problema.sucesores_lote y otra a heuristica.lote.
+
+    """
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    clave = _funcion_clave(problema)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    secundaria, cola = _prepara_cola(desempate, cola)
+    nodo_inicial = NodoBusqueda(s0)
+    nodo_inicial.h = heuristica(nodo_inicial)
+    llave = clave(s0)
+    cola.agrega(nodo_inicial.costo + peso * nodo_inicial.h,
+                secundaria(nodo_inicial) if secundaria else 0, (llave, nodo_inicial))
+    visitados = {llave: nodo_inicial.costo}
+    nodos_visitados = 0
+
+    tope_nodos = float('inf')
+    if presupuesto is not None and presupuesto.max_nodos is not None:
+        tope_nodos = presupuesto.max_nodos
+    while cola:
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados, siempre=True)
+            if razon:
+                return _interrumpida(razon, nodos_visitados, est,
+                                     (nodo for _, nodo in cola.elementos()))
+            if presupuesto.pausa(nodos_visitados):
+                yield est
+        f_minima = cola.tope()
+        lote = []
+        while (cola and cola.tope() == f_minima and len(lote) < tam_lote and
+               nodos_visitados < tope_nodos):
+            _, (llave, nodo) = cola.saca()
+            if visitados[llave] < nodo.costo:
+                cola.descarta()
+                est.obsoletas += 1
+                continue
+            nodos_visitados += 1
+            est.expandidos += 1
+            if on_expand is not None:
+                on_expand(nodo.estado, nodo.costo)
+            if problema.terminal(nodo.estado):
+                return _resultado(nodo, nodos_visitados, est)
+            lote.append(nodo)
+        if not lote:
+            continue
+
+        hijos, padres, acciones, costos = problema.sucesores_lote(
+            np.array([nodo.estado for nodo in lote]))
+        valores_h = heuristica.lote(hijos).tolist()
+        est.generados += len(valores_h)
+        for estado, padre, accion, costo_local, h in zip(
+                map(tuple, hijos.tolist()), padres.tolist(), acciones, costos.tolist(), valores_h):
+            hijo = NodoBusqueda(estado, accion, lote[padre], costo_local)
+            llave = clave(estado)
+            if llave not in visitados or visitados[llave] > hijo.costo:
+                visitados[llave] = hijo.costo
+                hijo.h = h
+                if on_generate is not None:
+                    on_generate(hijo.estado, hijo.costo)
+                cola.agrega(hijo.costo + peso * h,
+                            secundaria(hijo) if secundaria else 0, (llave, hijo))
+            else:
+                est.duplicados += 1
+        est.tamanos(len(cola), len(visitados))
+
+    return _resultado(None, nodos_visitados, est)
+
+
+def busqueda_ARA_estrella(problema, s0, heuristica, peso=3.0, decremento=0.5,
+                          max_segundos=None, max_nodos=None, estadisticas=None,
+                          cancelacion=None):
+    """
+    Búsqueda ARA* (A* ponderado que se repara hasta que se acaba el tiempo)
+
+    Empieza con un A* ponderado (f = g + peso * h) que encuentra pronto un
+    plan, y luego baja el peso y vuelve a buscar reutilizando todo lo ya
+    explorado: solo se reabren los estados cuyo costo mejoró. Cada vez que
+    se mejora el plan (o la cota) se produce el nuevo resultado, de modo
+    que quien llama puede quedarse con el último que alcanzó a recibir.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+    @param s0: El estado inicial del problema.
+    @param heuristica: Una función heuristica(nodo) igual que en A*. Las
+                       cotas solo son válidas si es admisible.
+    @param peso: Peso inicial (mayor o igual a 1).
+    @param decremento: Cuánto baja el peso en cada iteración (hasta 1).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param max_nodos: Máximo de nodos expandidos (sin límite si es None).
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return Un generador de tuplas (nodo, cota): el mejor plan encontrado
+            hasta el momento y una cota demostrada de qué tanto puede
+            costar más que el óptimo (nodo.costo <= cota * óptimo). La
+            última tupla tiene cota 1 si se alcanzó a probar que el plan
+            es óptimo.
+
+    """
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return
+    clave = _funcion_clave(problema)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    delta = getattr(heuristica, 'delta', None)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion)
+    nodos_visitados = 0
+
+    nodo_inicial = NodoBusqueda(s0)
+    nodo_inicial.h = heuristica(nodo_inicial)
+    llave = clave(s0)
+    mejores = {llave: nodo_inicial}     # Mejor nodo conocido por estado
+    abiertos = {llave}                  # OPEN
+    cerrados = set()                    # CLOSED de la iteración actual
+    inconsistentes = set()              # INCONS: mejoraron estando cerrados
+    incumbente, entregado, cota = None, None, float('inf')
+    contador = 0
+
+    while True:
+        frontera = []
+        for llave in abiertos:
+            nodo = mejores[llave]
+            contador += 1
+            frontera.append((nodo.costo + peso * nodo.h, -nodo.costo, contador, llave, nodo.costo))
+        heapq.heapify(frontera)
+
+        # Mejora el camino con el peso actual
+        while frontera:
+            f, _, _, llave, costo = frontera[0]
+            if llave not in abiertos or mejores[llave].costo != costo:
+                heapq.heappop(frontera)
+                est.obsoletas += 1
+                continue
+            if incumbente is not None and f >= incumbente.costo:
+                break
+            if presupuesto is not None and presupuesto.agotado(nodos_visitados):
+                return
+            heapq.heappop(frontera)
+            abiertos.remove(llave)
+            cerrados.add(llave)
+            nodo = mejores[llave]
+            nodos_visitados += 1
+            est.expandidos += 1
+            if on_expand is not None:
+                on_expand(nodo.estado, nodo.costo)
+            if problema.terminal(nodo.estado):
+                if incumbente is None or nodo.costo < incumbente.costo:
+                    incumbente = nodo
+                continue
+            for hijo in nodo.expande(problema):
+                est.generados += 1
+                llave_hijo = clave(hijo.estado)
+                anterior = mejores.get(llave_hijo)
+                if anterior is not None and anterior.costo <= hijo.costo:
+                    est.duplicados += 1
+                    continue
+                hijo.h = (anterior.h if anterior is not None else
+                          delta(nodo.h, nodo.estado, hijo.accion, hijo.estado) if delta
+                          else heuristica(hijo))
+                mejores[llave_hijo] = hijo
+                if on_generate is not None:
+                    on_generate(hijo.estado, hijo.costo)
+                if llave_hijo in cerrados:
+                    inconsistentes.add(llave_hijo)
+                else:
+                    abiertos.add(llave_hijo)
+                    contador += 1
+                    heapq.heappush(frontera, (hijo.costo + peso * hijo.h, -hijo.costo,
+                                              contador, llave_hijo, hijo.costo))
+            est.tamanos(len(frontera), len(mejores))
+
+        if incumbente is None:
+            return
+        # La mínima g + h entre los estados pendientes acota al óptimo por abajo
+        pendientes = [mejores[llave].costo + mejores[llave].h for llave in abiertos | inconsistentes]
+        minimo = min(pendientes, default=incumbente.costo)
+        nueva_cota = (1 if minimo >= incumbente.costo else
+                      min(peso, incumbente.costo / minimo) if minimo > 0 else peso)
+        if nueva_cota < cota or incumbente is not entregado:
+            cota, entregado = min(cota, nueva_cota), incumbente
+            yield incumbente, cota
+        if cota <= 1 or peso <= 1:
+            return
+        peso = max(1, peso - decremento)
+        abiertos |= inconsistentes
+        inconsistentes, cerrados = set(), set()
+
+
+def busqueda_haz(problema, s0, heuristica, ancho=100, max_profundidad=None, estadisticas=None,
+                 max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    Búsqueda en haz
+
+    Avanza por capas como la búsqueda a lo ancho, pero de cada capa solo
+    se quedan los ancho nodos con menor f = g + h. La memoria queda
+    acotada por ancho * profundidad (los nodos del haz y sus ancestros),
+    a cambio de que no es completa ni óptima.
 
-                f_n_hijo = hijo.costo + heuristica(hijo)
-                heapq.heappush(frontera, (f_n_hijo, hijo))
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+    @param s0: El estado inicial del problema.
+    @param heuristica: Una función heuristica(nodo) igual que en A*.
+    @param ancho: Número de nodos que se conservan en cada capa.
+    @param max_profundidad: Si no es None, se deja de buscar después de
+                            esa capa (el haz puede dar vueltas sin fin en
+                            espacios grandes, ya que no es completo).
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return nodo, nodos_visitados (en un ResultadoBusqueda). El nodo con el
+            plan (o None si el haz se quedó vacío) y el número de nodos
+            expandidos.
+
+    """
+    return _ejecuta(_pasos_haz(problema, s0, heuristica, ancho, max_profundidad, estadisticas,
+                               max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_haz(problema, s0, heuristica, ancho=100, max_profundidad=None, estadisticas=None,
+               max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_haz (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    clave = _funcion_clave(problema)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    delta = getattr(heuristica, 'delta', None)
+    nodo_inicial = NodoBusqueda(s0)
+    nodo_inicial.h = heuristica(nodo_inicial)
+    haz = [nodo_inicial]
+    vistos = {clave(s0)}
+    nodos_visitados = 0
+
+    while haz:
+        for nodo in haz:
+            if problema.terminal(nodo.estado):
+                return _resultado(nodo, nodos_visitados, est)
+        if max_profundidad is not None and haz[0].profundidad >= max_profundidad:
+            break
+        candidatos = {}
+        for nodo in haz:
+            if presupuesto is not None:
+                razon = presupuesto.agotado(nodos_visitados)
+                if razon:
+                    return _interrumpida(razon, nodos_visitados, est, haz)
+                if presupuesto.pausa(nodos_visitados):
+                    yield est
+            nodos_visitados += 1
+            est.expandidos += 1
+            if on_expand is not None:
+                on_expand(nodo.estado, nodo.costo)
+            for hijo in nodo.expande(problema):
+                est.generados += 1
+                llave = clave(hijo.estado)
+                if llave in vistos or (llave in candidatos and
+                                       candidatos[llave].costo <= hijo.costo):
+                    est.duplicados += 1
+                    continue
+                hijo.h = (delta(nodo.h, nodo.estado, hijo.accion, hijo.estado) if delta
+                          else heuristica(hijo))
+                if on_generate is not None:
+                    on_generate(hijo.estado, hijo.costo)
+                candidatos[llave] = hijo
+        mejores = heapq.nsmallest(ancho, candidatos.items(),
+                                  key=lambda par: (par[1].costo + par[1].h, par[1].h))
+        vistos.update(llave for llave, _ in mejores)
+        haz = [hijo for _, hijo in mejores]
+        est.tamanos(len(candidatos), len(vistos))
+    return _resultado(None, nodos_visitados, est)
+
+
+class _NodoSMA:
+    """
+    Nodo del árbol que guarda SMA* en memoria.
+
+    """
+    __slots__ = ('nodo', 'padre', 'hijos', 'f', 'olvidado', 'version')
+
+    def __init__(self, nodo, padre, f):
+        self.nodo = nodo
+        self.padre = padre
+        self.hijos = None           # None mientras sea hoja
+        self.f = f
+        self.olvidado = float('inf')  # Menor f de los hijos que se borraron
+        self.version = 0
+
+
+def busqueda_SMA_estrella(problema, s0, heuristica, max_memoria=100000, estadisticas=None,
+                          max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    Búsqueda SMA* (A* simplificado con memoria acotada)
+
+    Es A* sobre el árbol de búsqueda, pero nunca guarda más de max_memoria
+    nodos: cuando se llena la memoria se borra la hoja más superficial
+    con mayor f, y su f se respalda en el padre para que, si después
+    resulta ser lo mejor, se vuelva a generar. Cada nodo expandido toma
+    como f el menor f de sus hijos, así que f siempre es la mejor cota
+    conocida del subárbol.
+
+    Si max_memoria alcanza para guardar el camino a la solución óptima, esa
+    es la que se encuentra (con h admisible); si no, regresa None.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+    @param s0: El estado inicial del problema.
+    @param heuristica: Una función heuristica(nodo) igual que en A*.
+    @param max_memoria: Máximo de nodos en memoria.
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return nodo, nodos_visitados (en un ResultadoBusqueda). El nodo con
+            el plan completo (o None) y el número de nodos expandidos.
+
+    """
+    return _ejecuta(_pasos_SMA_estrella(problema, s0, heuristica, max_memoria, estadisticas,
+                                        max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_SMA_estrella(problema, s0, heuristica, max_memoria=100000, estadisticas=None,
+                        max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_SMA_estrella (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    delta = getattr(heuristica, 'delta', None)
+    infinito = float('inf')
+    nodo_inicial = NodoBusqueda(s0)
+    nodo_inicial.h = heuristica(nodo_inicial)
+    raiz = _NodoSMA(nodo_inicial, None, nodo_inicial.h)
+    mejores, peores = [], []   # Montículos de hojas con eliminación perezosa
+    contador = 0
+    num_nodos, num_hojas = 1, 1
+    nodos_visitados = 0
+
+    def agrega_hoja(hoja):
+        nonlocal contador
+        hoja.version += 1
+        contador += 1
+        heapq.heappush(mejores, (hoja.f, -hoja.nodo.profundidad, contador, hoja.version, hoja))
+        heapq.heappush(peores, (-hoja.f, hoja.nodo.profundidad, contador, hoja.version, hoja))
+
+    def vigente(entrada):
+        hoja = entrada[4]
+        return hoja.hijos is None and hoja.version == entrada[3]
+
+    def respalda(nodo_sma):
+        # Recalcula f de nodo_sma y sus ancestros a partir de sus hijos
+        while nodo_sma is not None:
+            f = min([hijo.f for hijo in nodo_sma.hijos] + [nodo_sma.olvidado])
+            if f == nodo_sma.f:
+                break
+            nodo_sma.f = f
+            nodo_sma = nodo_sma.padre
+
+    agrega_hoja(raiz)
+    while True:
+        while mejores and not vigente(mejores[0]):
+            heapq.heappop(mejores)
+        if not mejores or mejores[0][0] == infinito:
+            return _resultado(None, nodos_visitados, est)
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados)
+            if razon:
+                return _interrumpida(razon, nodos_visitados, est,
+                                     (entrada[4].nodo for entrada in mejores if vigente(entrada)))
+            if presupuesto.pausa(nodos_visitados):
+                yield est
+        actual = heapq.heappop(mejores)[4]
+        nodo = actual.nodo
+        if problema.terminal(nodo.estado):
+            return _resultado(nodo, nodos_visitados, est)
+
+        nodos_visitados += 1
+        est.expandidos += 1
+        if on_expand is not None:
+            on_expand(nodo.estado, nodo.costo)
+        camino, ancestro = set(), nodo
+        while ancestro is not None:
+            camino.add(ancestro.estado)
+            ancestro = ancestro.padre
+        hijos = []
+        for hijo in nodo.expande(problema):
+            est.generados += 1
+            if hijo.estado in camino:
+                est.duplicados += 1
+                continue
+            if on_generate is not None:
+                on_generate(hijo.estado, hijo.costo)
+            hijo.h = (delta(nodo.h, nodo.estado, hijo.accion, hijo.estado) if delta
+                      else heuristica(hijo))
+            if hijo.profundidad >= max_memoria - 1 and not problema.terminal(hijo.estado):
+                f = infinito  # No cabe en memoria un camino más largo
+            else:
+                f = max(actual.f, hijo.costo + hijo.h)
+            hijos.append(_NodoSMA(hijo, actual, f))
+
+        # actual deja de ser hoja; sus hijos lo son
+        actual.hijos, actual.olvidado = hijos, infinito
+        num_hojas -= 1
+        for hijo in hijos:
+            agrega_hoja(hijo)
+        num_nodos += len(hijos)
+        num_hojas += len(hijos)
+        if not hijos:
+            actual.hijos = None
+            actual.f = infinito
+            num_hojas += 1
+            agrega_hoja(actual)
+            if actual.padre is not None:
+                respalda(actual.padre)
+        else:
+            respalda(actual)
+
+        # Si no cabe, se borran las peores hojas (nunca la raíz)
+        while num_nodos > max_memoria:
+            while not vigente(peores[0]) or peores[0][4] is raiz:
+                heapq.heappop(peores)
+            hoja = heapq.heappop(peores)[4]
+            padre = hoja.padre
+            padre.hijos.remove(hoja)
+            padre.olvidado = min(padre.olvidado, hoja.f)
+            hoja.version += 1
+            num_nodos -= 1
+            num_hojas -= 1
+            if not padre.hijos:
+                padre.hijos = None
+                padre.f = padre.olvidado
+                num_hojas += 1
+                agrega_hoja(padre)
+                if padre.padre is not None:
+                    respalda(padre.padre)
+            else:
+                respalda(padre)
+        est.tamanos(num_hojas, num_nodos)
+
+
+class _Relevo:
+    """
+    Estado que la búsqueda por fronteras guarda cada cierto número de
+    capas para poder reconstruir el plan. Vive mientras algún nodo abierto
+    descienda de él.
+
+    """
+    __slots__ = ('estado', 'padre', 'costo', 'profundidad')
+
+    def __init__(self, estado, padre, costo, profundidad):
+        self.estado = estado
+        self.padre = padre
+        self.costo = costo
+        self.profundidad = profundidad
+
+
+def _tramo(problema, origen, destino, pasos, costo):
+    """
+    Acciones de un camino de exactamente pasos acciones y costo costo de
+    origen a destino (búsqueda en profundidad acotada, sin deshacer la
+    acción anterior).
+
+    """
+    camino = []
+
+    def busca(estado, restantes, costo_restante, previa):
+        if restantes == 0:
+            return estado == destino and abs(costo_restante) < 1e-9
+        inversa = None if previa is None else problema.accion_inversa(previa)
+        for accion in problema.acciones(estado):
+            if accion == inversa:
+                continue
+            hijo, costo_local = problema.sucesor(estado, accion)
+            if costo_local > costo_restante + 1e-9:
+                continue
+            camino.append(accion)
+            if busca(hijo, restantes - 1, costo_restante - costo_local, accion):
+                return True
+            camino.pop()
+        return False
+
+    if not busca(origen, pasos, costo, None):
+        raise ValueError("No se encontró el tramo entre dos relevos; "
+                         "¿las acciones son reversibles?")
+    return camino
+
+
+def _plan_relevos(problema, s0, nodo, relevo):
+    """
+    Reconstruye el plan de un nodo de la búsqueda por fronteras: la cadena
+    de relevos divide el camino en tramos cortos, y cada uno se vuelve a
+    encontrar con _tramo.
+
+    """
+    puntos = [(nodo.estado, nodo.costo, nodo.profundidad)]
+    while relevo is not None:
+        puntos.append((relevo.estado, relevo.costo, relevo.profundidad))
+        relevo = relevo.padre
+    puntos.append((s0, 0, 0))
+    puntos.reverse()
+    plan = NodoBusqueda(s0)
+    for (origen, costo_origen, prof_origen), (destino, costo_destino, prof_destino) in zip(
+            puntos, puntos[1:]):
+        for accion in _tramo(problema, origen, destino, prof_destino - prof_origen,
+                             costo_destino - costo_origen):
+            estado_sucesor, costo_local = problema.sucesor(plan.estado, accion)
+            plan = NodoBusqueda(estado_sucesor, accion, plan, costo_local)
+    return plan
+
+
+def busqueda_frontera(problema, s0, heuristica=None, intervalo=4, desempate='profundo',
+                      cola=None, estadisticas=None, max_nodos=None, max_segundos=None,
+                      cancelacion=None):
+    """
+    Búsqueda por fronteras (Korf): A* o costo uniforme sin lista de
+    cerrados, para problemas donde toda acción se puede deshacer.
+
+    Un nodo se borra en cuanto se expande, y para no volver a generarlo
+    cada nodo abierto guarda un bit por cada acción que lleva a un vecino
+    ya generado (la inversa de la acción con la que se llegó a él, de cada
+    padre). Así en memoria solo queda la frontera.
+
+    Como los nodos no apuntan a su padre, cada intervalo capas se guarda
+    un relevo (el estado y a qué relevo anterior desciende), que se libera
+    solo cuando ya ningún nodo abierto desciende de él. Al llegar a la
+    meta se divide el camino en los tramos entre relevos, y cada tramo se
+    vuelve a encontrar con una búsqueda en profundidad de intervalo pasos.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+                     que implemente accion_inversa.
+    @param heuristica: Una heurística consistente, o None para costo
+                       uniforme.
+    @param intervalo: Capas entre relevos: más grande usa menos memoria
+                      pero cada tramo cuesta más de reconstruir.
+    @param desempate: Orden entre nodos con el mismo f (ver _prepara_cola).
+    @param cola: Frontera a usar (ver busqueda_A_estrella).
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar;
+                         max_visitados es el máximo de nodos abiertos.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return Un objeto tipo Nodo con la estructura completa (dentro de un
+            ResultadoBusqueda, que se desempaca como nodo, nodos_visitados)
+
+    """
+    return _ejecuta(_pasos_frontera(problema, s0, heuristica, intervalo, desempate, cola,
+                                    estadisticas, max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_frontera(problema, s0, heuristica=None, intervalo=4, desempate='profundo',
+                    cola=None, estadisticas=None, max_nodos=None, max_segundos=None,
+                    cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_frontera (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    clave = _funcion_clave(problema, simetrias=False)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    secundaria, cola = _prepara_cola(desempate, cola)
+    delta = getattr(heuristica, 'delta', None)
+    bits = {}  # Bit de cada acción en las máscaras de acciones usadas
+
+    def bit(accion):
+        if accion not in bits:
+            bits[accion] = 1 << len(bits)
+        return bits[accion]
+
+    nodo_inicial = NodoBusqueda(s0)
+    nodo_inicial.h = heuristica(nodo_inicial) if heuristica else 0
+    llave = clave(s0)
+    cola.agrega(nodo_inicial.h, secundaria(nodo_inicial) if secundaria else 0,
+                (llave, nodo_inicial))
+    # llave -> [nodo, acciones usadas, relevo del que desciende]
+    abiertos = {llave: [nodo_inicial, 0, None]}
+    nodos_visitados = 0
+
+    while cola:
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados)
+            if razon:
+                mejor = min((entrada for entrada in abiertos.values()),
+                            key=lambda entrada: (entrada[0].h or 0, -entrada[0].costo),
+                            default=None)
+                resultado = _interrumpida(razon, nodos_visitados, est)
+                if mejor is not None:
+                    resultado.mejor = _plan_relevos(problema, s0, mejor[0], mejor[2])
+                return resultado
+            if presupuesto.pausa(nodos_visitados):
+                yield est
+        _, (llave, nodo) = cola.saca()
+        entrada = abiertos.get(llave)
+        if entrada is None or entrada[0] is not nodo:
+            cola.descarta()
+            est.obsoletas += 1
+            continue
+        del abiertos[llave]
+        _, usados, relevo = entrada
+
+        nodos_visitados += 1
+        est.expandidos += 1
+        if on_expand is not None:
+            on_expand(nodo.estado, nodo.costo)
+        if problema.terminal(nodo.estado):
+            return _resultado(_plan_relevos(problema, s0, nodo, relevo), nodos_visitados, est)
+
+        if nodo.profundidad and nodo.profundidad % intervalo == 0:
+            relevo = _Relevo(nodo.estado, relevo, nodo.costo, nodo.profundidad)
+        profundidad = nodo.profundidad + 1
+        for accion in problema.acciones(nodo.estado):
+            if usados & bit(accion):
+                continue
+            estado_hijo, costo_local = problema.sucesor(nodo.estado, accion)
+            est.generados += 1
+            llave = clave(estado_hijo)
+            regreso = bit(problema.accion_inversa(accion))
+            costo = nodo.costo + costo_local
+            otro = abiertos.get(llave)
+            if otro is not None:
+                otro[1] |= regreso
+                if otro[0].costo <= costo:
+                    est.duplicados += 1
+                    continue
+            hijo = NodoBusqueda(estado_hijo, accion, None)
+            hijo.costo, hijo.profundidad = costo, profundidad
+            if heuristica is None:
+                hijo.h = 0
+            elif otro is not None:
+                hijo.h = otro[0].h
+            else:
+                hijo.h = (delta(nodo.h, nodo.estado, accion, estado_hijo) if delta
+                          else heuristica(hijo))
+            if on_generate is not None:
+                on_generate(estado_hijo, costo)
+            abiertos[llave] = [hijo, regreso if otro is None else otro[1], relevo]
+            cola.agrega(costo + hijo.h, secundaria(hijo) if secundaria else 0, (llave, hijo))
+        est.tamanos(len(cola), len(abiertos))
+
+    return _resultado(None, nodos_visitados, est)
+
+
+def busqueda_IDA_estrella(problema, s0, heuristica, iteraciones=None, estadisticas=None,
+                          max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    Búsqueda IDA* (A* por profundización iterativa)
+
+    Hace búsquedas a lo profundo acotadas por f(n) = g(n) + h(n), y en
+    cada iteración la cota crece al menor f que la rebasó. Solo se guarda
+    el camino actual (sin tabla de visitados), por lo que la memoria es
+    lineal en la profundidad de la solución.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+    @param s0: El estado inicial del problema.
+    @param heuristica: Una función heuristica(nodo) igual que en A*
+                       (también se usa su delta, si lo tiene).
+    @param iteraciones: Si se da una lista, se le agrega una tupla
+                        (cota_f, nodos_expandidos) por cada iteración.
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return nodo, nodos_visitados (en un ResultadoBusqueda). El nodo con
+            el plan completo (o None) y el total de nodos expandidos en
+            todas las iteraciones.
+
+    """
+    return _ejecuta(_pasos_IDA_estrella(problema, s0, heuristica, iteraciones, estadisticas,
+                                        max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_IDA_estrella(problema, s0, heuristica, iteraciones=None, estadisticas=None,
+                        max_nodos=None, max_segundos=None, cancelacion=None, nodos_por_paso=None):
+    "Versión por pasos de busqueda_IDA_estrella (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    problema, heuristica = est.instrumenta(problema, heuristica)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    nodo_inicial = NodoBusqueda(s0)
+    nodos_visitados = 0
+    if problema.terminal(s0):
+        return _resultado(nodo_inicial, nodos_visitados, est)
+
+    delta = getattr(heuristica, 'delta', None)
+    nodo_inicial.h = heuristica(nodo_inicial)
+    cota = nodo_inicial.costo + nodo_inicial.h
+    while True:
+        siguiente_cota = float('inf')
+        expansiones = 1
+        if on_expand is not None:
+            on_expand(s0, 0)
+        camino = {s0}
+        nodo = nodo_inicial
+        pila = [nodo_inicial.expande(problema)]
+
+        while pila:
+            hijo = next(pila[-1], None)
+            if hijo is None:
+                pila.pop()
+                camino.remove(nodo.estado)
+                nodo = nodo.padre
+                continue
+            est.generados += 1
+            if hijo.estado in camino:
+                est.duplicados += 1
+                continue
+            if on_generate is not None:
+                on_generate(hijo.estado, hijo.costo)
+            hijo.h = (delta(nodo.h, nodo.estado, hijo.accion, hijo.estado) if delta
+                      else heuristica(hijo))
+            f_n_hijo = hijo.costo + hijo.h
+            if f_n_hijo > cota:
+                siguiente_cota = min(siguiente_cota, f_n_hijo)
+                continue
+            if problema.terminal(hijo.estado):
+                nodos_visitados += expansiones
+                est.expandidos += expansiones
+                if iteraciones is not None:
+                    iteraciones.append((cota, expansiones))
+                return _resultado(hijo, nodos_visitados, est)
+            if presupuesto is not None:
+                razon = presupuesto.agotado(nodos_visitados + expansiones)
+                if razon:
+                    nodos_visitados += expansiones
+                    est.expandidos += expansiones
+                    camino_actual = []
+                    while nodo is not None:
+                        camino_actual.append(nodo)
+                        nodo = nodo.padre
+                    return _interrumpida(razon, nodos_visitados, est, camino_actual)
+                if presupuesto.pausa(nodos_visitados + expansiones):
+                    yield est
+            expansiones += 1
+            if on_expand is not None:
+                on_expand(hijo.estado, hijo.costo)
+            camino.add(hijo.estado)
+            pila.append(hijo.expande(problema))
+            est.tamanos(len(pila), len(camino))
+            nodo = hijo
+
+        nodos_visitados += expansiones
+        est.expandidos += expansiones
+        if iteraciones is not None:
+            iteraciones.append((cota, expansiones))
+        if siguiente_cota == float('inf'):
+            return _resultado(None, nodos_visitados, est)
+        cota = siguiente_cota
+
+
+def _plan_bidireccional(problema, s0, encuentro, adelante, atras):
+    """
+    Une las dos mitades de una búsqueda bidireccional en un solo nodo.
+
+    @param encuentro: La llave del estado donde se tocaron las fronteras.
+    @param adelante: Diccionario llave -> (llave_padre, accion) desde s0.
+    @param atras: Diccionario llave -> (llave_siguiente, accion) hacia la meta.
+
+    @return Un objeto tipo Nodo con el plan completo de s0 a la meta.
+
+    """
+    acciones = []
+    llave = encuentro
+    while adelante[llave][0] is not None:
+        llave, accion = adelante[llave]
+        acciones.append(accion)
+    acciones.reverse()
+    llave = encuentro
+    while atras[llave][0] is not None:
+        llave, accion = atras[llave]
+        acciones.append(accion)
+
+    nodo = NodoBusqueda(s0)
+    for accion in acciones:
+        estado_sucesor, costo_local = problema.sucesor(nodo.estado, accion)
+        nodo = NodoBusqueda(estado_sucesor, accion, nodo, costo_local)
+    return nodo
+
+
+def _interrumpida_bidireccional(razon, problema, s0, nodos_visitados, estadisticas,
+                                adelante, llave):
+    "Resultado interrumpido con el camino desde s0 hasta el estado llave"
+    mejor = _plan_bidireccional(problema, s0, llave, adelante, {llave: (None, None)})
+    return ResultadoBusqueda(None, nodos_visitados, razon, mejor, estadisticas)
+
+
+def busqueda_ancho_bidireccional(problema, s0, metas=None, estadisticas=None,
+                                 max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    Búsqueda a lo ancho bidireccional (costo unitario)
+
+    Avanza por capas desde s0 y hacia atrás desde los estados meta
+    (usando problema.predecesores), expandiendo siempre la frontera más
+    pequeña. Al encontrarse las fronteras se termina la capa y se elige
+    el encuentro de menor profundidad total.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+                     que implemente predecesores
+    @param s0: El estado inicial del problema.
+    @param metas: Un iterable con los estados meta; si es None se usa
+                  problema.estados_meta().
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return nodo, nodos_visitados (en un ResultadoBusqueda). Un objeto tipo
+            Nodo con el plan completo (o None) y el número de nodos
+            expandidos en ambos sentidos. Si se interrumpe, el mejor nodo
+            es el de mayor profundidad alcanzado desde s0.
+
+    """
+    return _ejecuta(_pasos_ancho_bidireccional(problema, s0, metas, estadisticas, max_nodos,
+                                               max_segundos, cancelacion))
+
+
+def _pasos_ancho_bidireccional(problema, s0, metas=None, estadisticas=None,
+                               max_nodos=None, max_segundos=None, cancelacion=None,
+                               nodos_por_paso=None):
+    "Versión por pasos de busqueda_ancho_bidireccional (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    clave = _funcion_clave(problema, simetrias=False)
+    problema, _ = est.instrumenta(problema)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    metas = list(problema.estados_meta() if metas is None else metas)
+    if problema.terminal(s0):
+        return _resultado(NodoBusqueda(s0), 0, est)
+
+    frontera_adelante = [(clave(s0), s0)]
+    frontera_atras = list({clave(meta): meta for meta in metas}.items())
+    adelante = {llave: (None, None) for llave, _ in frontera_adelante}
+    atras = {llave: (None, None) for llave, _ in frontera_atras}
+    profundidad_adelante = dict.fromkeys(adelante, 0)
+    profundidad_atras = dict.fromkeys(atras, 0)
+    nodos_visitados = 0
+
+    while frontera_adelante and frontera_atras:
+        mejor, encuentro = float('inf'), None
+        if len(frontera_adelante) <= len(frontera_atras):
+            nueva = []
+            for llave, estado in frontera_adelante:
+                if presupuesto is not None:
+                    razon = presupuesto.agotado(nodos_visitados)
+                    if razon:
+                        return _interrumpida_bidireccional(
+                            razon, problema, s0, nodos_visitados, est, adelante,
+                            max(frontera_adelante, key=lambda par: profundidad_adelante[par[0]])[0])
+                    if presupuesto.pausa(nodos_visitados):
+                        yield est
+                nodos_visitados += 1
+                est.expandidos += 1
+                if on_expand is not None:
+                    on_expand(estado, profundidad_adelante[llave])
+                for accion in problema.acciones(estado):
+                    hijo, _ = problema.sucesor(estado, accion)
+                    est.generados += 1
+                    llave_hijo = clave(hijo)
+                    if llave_hijo in adelante:
+                        est.duplicados += 1
+                        continue
+                    adelante[llave_hijo] = (llave, accion)
+                    profundidad_adelante[llave_hijo] = profundidad_adelante[llave] + 1
+                    if on_generate is not None:
+                        on_generate(hijo, profundidad_adelante[llave_hijo])
+                    nueva.append((llave_hijo, hijo))
+                    if llave_hijo in atras:
+                        total = profundidad_adelante[llave_hijo] + profundidad_atras[llave_hijo]
+                        if total < mejor:
+                            mejor, encuentro = total, llave_hijo
+            frontera_adelante = nueva
+        else:
+            nueva = []
+            for llave, estado in frontera_atras:
+                if presupuesto is not None:
+                    razon = presupuesto.agotado(nodos_visitados)
+                    if razon:
+                        return _interrumpida_bidireccional(
+                            razon, problema, s0, nodos_visitados, est, adelante,
+                            max(frontera_adelante, key=lambda par: profundidad_adelante[par[0]])[0])
+                    if presupuesto.pausa(nodos_visitados):
+                        yield est
+                nodos_visitados += 1
+                est.expandidos += 1
+                if on_expand is not None:
+                    on_expand(estado, profundidad_atras[llave])
+                for previo, accion, _ in problema.predecesores(estado):
+                    est.generados += 1
+                    llave_previo = clave(previo)
+                    if llave_previo in atras:
+                        est.duplicados += 1
+                        continue
+                    atras[llave_previo] = (llave, accion)
+                    profundidad_atras[llave_previo] = profundidad_atras[llave] + 1
+                    if on_generate is not None:
+                        on_generate(previo, profundidad_atras[llave_previo])
+                    nueva.append((llave_previo, previo))
+                    if llave_previo in adelante:
+                        total = profundidad_adelante[llave_previo] + profundidad_atras[llave_previo]
+                        if total < mejor:
+                            mejor, encuentro = total, llave_previo
+            frontera_atras = nueva
+        est.tamanos(len(frontera_adelante) + len(frontera_atras), len(adelante) + len(atras))
+        if encuentro is not None:
+            return _resultado(_plan_bidireccional(problema, s0, encuentro, adelante, atras),
+                              nodos_visitados, est)
+    return _resultado(None, nodos_visitados, est)
+
+
+def busqueda_costo_uniforme_bidireccional(problema, s0, metas=None, estadisticas=None,
+                                          max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    Búsqueda por costo uniforme bidireccional
+
+    Dos búsquedas de costo uniforme, una desde s0 y otra hacia atrás desde
+    los estados meta, que avanzan por el lado con menor costo en el tope.
+    Se detiene cuando la suma de los costos en el tope de ambas fronteras
+    alcanza al mejor encuentro, lo que garantiza que el plan es óptimo.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+                     que implemente predecesores
+    @param s0: El estado inicial del problema.
+    @param metas: Un iterable con los estados meta; si es None se usa
+                  problema.estados_meta().
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar.
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return nodo, nodos_visitados (en un ResultadoBusqueda). Un objeto tipo
+            Nodo con el plan completo (o None) y el número de nodos
+            expandidos en ambos sentidos. Si se interrumpe, el mejor nodo
+            es el de mayor profundidad alcanzado desde s0.
+
+    """
+    return _ejecuta(_pasos_costo_uniforme_bidireccional(problema, s0, metas, estadisticas,
+                                                        max_nodos, max_segundos, cancelacion))
+
+
+def _pasos_costo_uniforme_bidireccional(problema, s0, metas=None, estadisticas=None,
+                                        max_nodos=None, max_segundos=None, cancelacion=None,
+                                        nodos_por_paso=None):
+    "Versión por pasos de busqueda_costo_uniforme_bidireccional (ver busqueda_por_pasos)"
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    clave = _funcion_clave(problema, simetrias=False)
+    problema, _ = est.instrumenta(problema)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    metas = list(problema.estados_meta() if metas is None else metas)
+    if problema.terminal(s0):
+        return _resultado(NodoBusqueda(s0), 0, est)
+
+    frontera_adelante = [(0, 0, clave(s0), s0)]
+    frontera_atras = [(0, i + 1, llave, meta)
+                      for i, (llave, meta) in enumerate({clave(meta): meta for meta in metas}.items())]
+    adelante = {llave: (None, None) for _, _, llave, _ in frontera_adelante}
+    atras = {llave: (None, None) for _, _, llave, _ in frontera_atras}
+    costo_adelante, costo_atras = dict.fromkeys(adelante, 0), dict.fromkeys(atras, 0)
+    contador = len(frontera_atras) + 1
+    mejor, encuentro = float('inf'), None
+    nodos_visitados = 0
+
+    while frontera_adelante and frontera_atras:
+        if frontera_adelante[0][0] + frontera_atras[0][0] >= mejor:
+            break
+        if presupuesto is not None:
+            razon = presupuesto.agotado(nodos_visitados)
+            if razon:
+                return _interrumpida_bidireccional(razon, problema, s0, nodos_visitados, est,
+                                                   adelante, max(costo_adelante, key=costo_adelante.get))
+            if presupuesto.pausa(nodos_visitados):
+                yield est
+        if frontera_adelante[0][0] <= frontera_atras[0][0]:
+            costo, _, llave, estado = heapq.heappop(frontera_adelante)
+            if costo > costo_adelante[llave]:
+                est.obsoletas += 1
+                continue
+            nodos_visitados += 1
+            est.expandidos += 1
+            if on_expand is not None:
+                on_expand(estado, costo)
+            for accion in problema.acciones(estado):
+                hijo, costo_local = problema.sucesor(estado, accion)
+                est.generados += 1
+                llave_hijo, nuevo = clave(hijo), costo + costo_local
+                if llave_hijo in costo_adelante and costo_adelante[llave_hijo] <= nuevo:
+                    est.duplicados += 1
+                    continue
+                costo_adelante[llave_hijo], adelante[llave_hijo] = nuevo, (llave, accion)
+                if on_generate is not None:
+                    on_generate(hijo, nuevo)
+                heapq.heappush(frontera_adelante, (nuevo, contador, llave_hijo, hijo))
+                contador += 1
+                if llave_hijo in costo_atras and nuevo + costo_atras[llave_hijo] < mejor:
+                    mejor, encuentro = nuevo + costo_atras[llave_hijo], llave_hijo
+        else:
+            costo, _, llave, estado = heapq.heappop(frontera_atras)
+            if costo > costo_atras[llave]:
+                est.obsoletas += 1
+                continue
+            nodos_visitados += 1
+            est.expandidos += 1
+            if on_expand is not None:
+                on_expand(estado, costo)
+            for previo, accion, costo_local in problema.predecesores(estado):
+                est.generados += 1
+                llave_previo, nuevo = clave(previo), costo + costo_local
+                if llave_previo in costo_atras and costo_atras[llave_previo] <= nuevo:
+                    est.duplicados += 1
+                    continue
+                costo_atras[llave_previo], atras[llave_previo] = nuevo, (llave, accion)
+                if on_generate is not None:
+                    on_generate(previo, nuevo)
+                heapq.heappush(frontera_atras, (nuevo, contador, llave_previo, previo))
+                contador += 1
+                if llave_previo in costo_adelante and nuevo + costo_adelante[llave_previo] < mejor:
+                    mejor, encuentro = nuevo + costo_adelante[llave_previo], llave_previo
+        est.tamanos(len(frontera_adelante) + len(frontera_atras), len(costo_adelante) + len(costo_atras))
+
+    if encuentro is None:
+        return _resultado(None, nodos_visitados, est)
+    return _resultado(_plan_bidireccional(problema, s0, encuentro, adelante, atras),
+                      nodos_visitados, est)
+
+
+# ---------------------------------------------------------------------
+#
+# Búsqueda a lo ancho en disco, con detección retrasada de duplicados
+#
+# ---------------------------------------------------------------------
+
+def _lee_registros(ruta, ancho, tam_bloque=1 << 16):
+    "Los registros de ancho bytes de un archivo, leídos en bloques secuenciales"
+    with open(ruta, 'rb', buffering=0) as archivo:
+        while True:
+            bloque = archivo.read(ancho * tam_bloque)
+            if not bloque:
+                return
+            for i in range(0, len(bloque), ancho):
+                yield bloque[i:i + ancho]
+
+
+def _escribe_corrida(ruta, registros):
+    "Ordena registros en memoria y los escribe sin repetidos"
+    registros.sort()
+    with open(ruta, 'wb', buffering=1 << 20) as archivo:
+        anterior = None
+        for registro in registros:
+            if registro != anterior:
+                archivo.write(registro)
+                anterior = registro
+
+
+def _fusiona_capa(corridas, previas, ruta, ancho):
+    """
+    Mezcla las corridas ordenadas de una capa nueva en un solo archivo
+    ordenado, sin repetidos y sin los estados de las capas previas (que
+    también están ordenadas, así que basta con avanzar en ellas).
+
+    @return: El número de registros escritos.
+
+    """
+    previos = [_lee_registros(p, ancho) for p in previas]
+    actuales = [next(lector, None) for lector in previos]
+    escritos = 0
+    anterior = None
+    with open(ruta, 'wb', buffering=1 << 20) as archivo:
+        for registro in heapq.merge(*(_lee_registros(c, ancho) for c in corridas)):
+            if registro == anterior:
+                continue
+            anterior = registro
+            repetido = False
+            for i, lector in enumerate(previos):
+                while actuales[i] is not None and actuales[i] < registro:
+                    actuales[i] = next(lector, None)
+                repetido = repetido or actuales[i] == registro
+            if not repetido:
+                archivo.write(registro)
+                escritos += 1
+    return escritos
+
+
+def _contiene(ruta, ancho, registro):
+    "Búsqueda binaria de un registro en un archivo ordenado"
+    with open(ruta, 'rb') as archivo:
+        bajo, alto = 0, os.path.getsize(ruta) // ancho
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            archivo.seek(medio * ancho)
+            actual = archivo.read(ancho)
+            if actual == registro:
+                return True
+            if actual < registro:
+                bajo = medio + 1
+            else:
+                alto = medio
+    return False
+
+
+def busqueda_ancho_externa(problema, s0, bytes_por_estado=8, directorio=None,
+                           tam_bloque=1 << 20, capas=None, estadisticas=None,
+                           max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    Búsqueda a lo ancho con la frontera y los visitados en disco, para
+    espacios que no caben en memoria.
+
+    Cada capa se guarda en un archivo ordenado de estados codificados
+    (codifica en bytes_por_estado bytes). Los hijos de una capa se juntan
+    en memoria de tam_bloque en tam_bloque, se ordenan y se escriben como
+    corridas; al terminar la capa las corridas se mezclan en orden, se
+    quitan los repetidos y los que ya estaban en las dos capas anteriores
+    (detección retrasada de duplicados). Todo es lectura y escritura
+    secuencial, y en memoria solo hay un bloque a la vez.
+
+    Quitar solo las dos capas anteriores basta si toda acción se puede
+    deshacer (como en los rompecabezas y el cubo); en otros problemas un
+    estado podría volver a aparecer y la búsqueda no terminar.
+
+    El plan se recupera sin apuntadores: desde el padre de la meta se
+    busca, con problema.predecesores, un estado de la capa anterior (con
+    búsqueda binaria en su archivo), y así hasta s0.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda
+                     que implemente codifica y decodifica.
+    @param bytes_por_estado: Bytes de cada código (por ejemplo 6 para el
+                             15 puzzle y 54 para el cubo).
+    @param directorio: Dónde crear los archivos temporales (el directorio
+                       temporal del sistema por omisión). Se borran al
+                       terminar.
+    @param tam_bloque: Estados por corrida ordenada en memoria.
+    @param capas: Una lista opcional donde se agrega el número de estados
+                  de cada capa (para explorar todo el espacio, con un
+                  problema sin meta).
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar
+                         (el costo de los callbacks es la profundidad).
+    @param max_nodos: Máximo de nodos a expandir (sin límite si es None).
+    @param max_segundos: Tiempo máximo en segundos (sin límite si es None).
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return Un objeto tipo Nodo con un plan completo (dentro de un
+            ResultadoBusqueda, que se desempaca como nodo, nodos_visitados).
+            Si se interrumpe, mejor es el camino al último estado
+            expandido (de la capa más profunda).
+
+    """
+    return _ejecuta(_pasos_ancho_externa(problema, s0, bytes_por_estado, directorio, tam_bloque,
+                                         capas, estadisticas, max_nodos, max_segundos,
+                                         cancelacion))
+
+
+def _pasos_ancho_externa(problema, s0, bytes_por_estado=8, directorio=None,
+                         tam_bloque=1 << 20, capas=None, estadisticas=None,
+                         max_nodos=None, max_segundos=None, cancelacion=None,
+                         nodos_por_paso=None):
+    "Versión por pasos de busqueda_ancho_externa (ver busqueda_por_pasos)"
+    if type(problema).codifica is ProblemaBusqueda.codifica:
+        raise ValueError("La búsqueda en disco necesita que el problema implemente codifica.")
+    est = estadisticas if estadisticas is not None else EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return _resultado(None, 0, est)
+    presupuesto = _Presupuesto.crea(max_nodos, max_segundos, cancelacion, nodos_por_paso)
+    problema, _ = est.instrumenta(problema)
+    on_expand, on_generate = est.on_expand, est.on_generate
+    ancho = bytes_por_estado
+    nodos_visitados = 0
+    if capas is not None:
+        capas.append(1)
+    if problema.terminal(s0):
+        return _resultado(NodoBusqueda(s0), nodos_visitados, est)
+
+    def registro(estado):
+        try:
+            return problema.codifica(estado).to_bytes(ancho, 'big')
+        except OverflowError:
+            raise ValueError(f"El código de {estado} no cabe en {ancho} bytes.") from None
+
+    def camino(estado, profundidad):
+        # De estado hacia atrás, un predecesor en cada capa anterior
+        acciones, actual = [], estado
+        for anterior in reversed(rutas[:profundidad]):
+            for previo, accion, _ in problema.predecesores(actual):
+                if _contiene(anterior, ancho, registro(previo)):
+                    acciones.append(accion)
+                    actual = previo
+                    break
+        nodo = NodoBusqueda(s0)
+        for accion in reversed(acciones):
+            estado_sucesor, costo_local = problema.sucesor(nodo.estado, accion)
+            nodo = NodoBusqueda(estado_sucesor, accion, nodo, costo_local)
+        return nodo
+
+    def plan(padre, profundidad, hijo):
+        nodo = camino(padre, profundidad)
+        for accion in problema.acciones(padre):
+            estado_sucesor, costo_local = problema.sucesor(padre, accion)
+            if estado_sucesor == hijo:
+                return NodoBusqueda(estado_sucesor, accion, nodo, costo_local)
+
+    with tempfile.TemporaryDirectory(prefix='ancho_', dir=directorio) as carpeta:
+        rutas = [os.path.join(carpeta, 'capa_0')]
+        _escribe_corrida(rutas[0], [registro(s0)])
+        total = 1
+        ultimo = (s0, 0)    # El último estado expandido y su profundidad
+        while True:
+            profundidad = len(rutas) - 1
+            corridas, hijos = [], []
+            generados = est.generados
+            for codigo in _lee_registros(rutas[-1], ancho):
+                if presupuesto is not None:
+                    razon = presupuesto.agotado(nodos_visitados)
+                    if razon:
+                        return _interrumpida(razon, nodos_visitados, est, [camino(*ultimo)])
+                    if presupuesto.pausa(nodos_visitados):
+                        yield est
+                estado = problema.decodifica(int.from_bytes(codigo, 'big'))
+                ultimo = (estado, profundidad)
+                nodos_visitados += 1
+                est.expandidos += 1
+                if on_expand is not None:
+                    on_expand(estado, profundidad)
+                for accion in problema.acciones(estado):
+                    hijo, _ = problema.sucesor(estado, accion)
+                    est.generados += 1
+                    if problema.terminal(hijo):
+                        return _resultado(plan(estado, profundidad, hijo), nodos_visitados, est)
+                    hijos.append(registro(hijo))
+                if len(hijos) >= tam_bloque:
+                    corridas.append(os.path.join(carpeta, f'corrida_{len(corridas)}'))
+                    _escribe_corrida(corridas[-1], hijos)
+                    hijos = []
+            if hijos:
+                corridas.append(os.path.join(carpeta, f'corrida_{len(corridas)}'))
+                _escribe_corrida(corridas[-1], hijos)
+                hijos = []
+
+            rutas.append(os.path.join(carpeta, f'capa_{profundidad + 1}'))
+            nuevos = _fusiona_capa(corridas, rutas[-3:-1], rutas[-1], ancho)
+            for corrida in corridas:
+                os.remove(corrida)
+            est.duplicados += est.generados - generados - nuevos
+            total += nuevos
+            if on_generate is not None:
+                for codigo in _lee_registros(rutas[-1], ancho):
+                    on_generate(problema.decodifica(int.from_bytes(codigo, 'big')),
+                                profundidad + 1)
+            if capas is not None:
+                capas.append(nuevos)
+            est.tamanos(nuevos, total)
+            if nuevos == 0:
+                return _resultado(None, nodos_visitados, est)
+
+
+# Versiones por pasos de cada búsqueda (todas regresan un ResultadoBusqueda)
+_PASOS = {
+    busqueda_ancho: _pasos_ancho,
+    busqueda_profundo: _pasos_profundo,
+    busqueda_profundidad_iterativa: _pasos_profundidad_iterativa,
+    busqueda_costo_uniforme: _pasos_costo_uniforme,
+    busqueda_A_estrella: _pasos_A_estrella,
+    busqueda_haz: _pasos_haz,
+    busqueda_SMA_estrella: _pasos_SMA_estrella,
+    busqueda_frontera: _pasos_frontera,
+    busqueda_IDA_estrella: _pasos_IDA_estrella,
+    busqueda_ancho_bidireccional: _pasos_ancho_bidireccional,
+    busqueda_costo_uniforme_bidireccional: _pasos_costo_uniforme_bidireccional,
+    busqueda_ancho_externa: _pasos_ancho_externa,
+}
+
+
+def busqueda_por_pasos(busqueda, problema, s0, *args, nodos_por_paso=1000, **kwargs):
+    """
+    Corre una búsqueda por rebanadas: cada nodos_por_paso nodos expandidos
+    cede el control, de modo que quien la consume puede intercalar varias
+    búsquedas, mostrar el avance o simplemente dejar de pedir pasos.
+
+        for paso in busqueda_por_pasos(busqueda_A_estrella, problema, s0, h):
+            if isinstance(paso, ResultadoBusqueda):
+                nodo, nodos_visitados = paso
+            else:
+                print(paso.expandidos)
+
+    Entre pasos la búsqueda está detenida por completo (sin hilos), así que
+    se puede revisar o modificar su EstadisticasBusqueda. Para ARA*, que ya
+    es un generador de soluciones, basta con iterarlo.
+
+    @param busqueda: Una de las búsquedas de este módulo, por ejemplo
+                     busqueda_A_estrella.
+    @param problema, s0, args, kwargs: Los argumentos de la búsqueda,
+                                       incluidos presupuestos y estadísticas.
+    @param nodos_por_paso: Nodos a expandir entre pausas (aproximado en las
+                           búsquedas que expanden por lotes).
+    @return: Un generador que entrega el EstadisticasBusqueda de la
+             búsqueda en cada pausa y, como último elemento, el
+             ResultadoBusqueda.
+
+    """
+    if busqueda not in _PASOS:
+        raise ValueError(f"{getattr(busqueda, '__name__', busqueda)} no tiene versión por pasos.")
+    resultado = yield from _PASOS[busqueda](problema, s0, *args,
+                                            nodos_por_paso=nodos_por_paso, **kwargs)
+    yield resultado
+
+
+async def busqueda_asincrona(busqueda, problema, s0, *args, nodos_por_paso=1000,
+                             ejecutor=None, progreso=None, **kwargs):
+    """
+    Versión para asyncio de cualquier búsqueda de este módulo.
+
+    Sin ejecutor, la búsqueda corre en el hilo del ciclo de eventos por
+    rebanadas de nodos_por_paso nodos (ver busqueda_por_pasos), y entre
+    rebanadas se espera a asyncio.sleep(0) para que avancen las demás
+    tareas. Con un ejecutor (ThreadPoolExecutor o ProcessPoolExecutor) la
+    búsqueda completa se manda a él con run_in_executor.
+
+    Cancelar la tarea detiene la búsqueda: sin ejecutor al terminar la
+    rebanada actual y con un ThreadPoolExecutor a lo más 256 nodos después
+    (con un threading.Event como cancelacion). Con un ProcessPoolExecutor
+    solo se evita que empiece si seguía en espera, y los argumentos deben
+    poderse serializar con pickle.
+
+    @param busqueda: Una de las búsquedas de este módulo.
+    @param problema, s0, args, kwargs: Los argumentos de la búsqueda.
+    @param nodos_por_paso: Nodos por rebanada cuando no hay ejecutor.
+    @param ejecutor: Un concurrent.futures.Executor opcional.
+    @param progreso: Función opcional progreso(estadisticas) que se llama
+                     en cada pausa (solo sin ejecutor).
+    @return: El ResultadoBusqueda.
+
+    """
+    if ejecutor is None:
+        for paso in busqueda_por_pasos(busqueda, problema, s0, *args,
+                                       nodos_por_paso=nodos_por_paso, **kwargs):
+            if isinstance(paso, ResultadoBusqueda):
+                return paso
+            if progreso is not None:
+                progreso(paso)
+            await asyncio.sleep(0)
 
-    return None, nodos_visitados
+    cancelacion = kwargs.get('cancelacion')
+    if cancelacion is None and isinstance(ejecutor, ThreadPoolExecutor):
+        cancelacion = kwargs['cancelacion'] = threading.Event()
+    futuro = asyncio.get_running_loop().run_in_executor(
+        ejecutor, partial(busqueda, problema, s0, *args, **kwargs))
+    try:
+        return await futuro
+    except asyncio.CancelledError:
+        if cancelacion is not None:
+            cancelacion.set()
+        raise
@@ -10,7 +10,10 @@ Una pequeña aplicación de las búsquedas
 __author__ = 'nombre del estudiante'
 
 
+from math import gcd
+
 import busquedas
+import paralelo
 
 
 class PbDosBotes(busquedas.ProblemaBusqueda):
@@ -26,9 +29,16 @@ class PbDosBotes(busquedas.ProblemaBusqueda):
     Se guarda el valor de x0_max y x1_max)
 
     """
-    def __init__(self, x0_max, x1_max, meta=0):
+    def __init__(self, x0_max, x1_max, meta=0, verifica_resoluble=True):
+        """
+        @param verifica_resoluble: Si es False las búsquedas no descartan
+                                   de antemano las metas imposibles (ver
+                                   es_resoluble).
+
+        """
         self.maximos = (x0_max, x1_max)
         self.meta = meta
+        self.verifica_resoluble = verifica_resoluble
 
     def acciones(self, estado):
         return [
@@ -59,6 +69,52 @@ class PbDosBotes(busquedas.ProblemaBusqueda):
     def terminal(self, estado):
         return self.meta in estado
 
+    def predecesores(self, estado):
+        """
+        Vaciar y llenar no se pueden deshacer, así que los predecesores se
+        buscan entre los estados que difieren en un solo cubo o que tienen
+        la misma cantidad total de agua (los únicos candidatos posibles).
+
+        """
+        x0_max, x1_max = self.maximos
+        total = estado[0] + estado[1]
+        candidatos = ({(v, estado[1]) for v in range(x0_max + 1)} |
+                      {(estado[0], v) for v in range(x1_max + 1)} |
+                      {(v, total - v) for v in range(max(0, total - x1_max), min(x0_max, total) + 1)})
+        for previo in candidatos:
+            for accion in self.acciones(previo):
+                siguiente, costo_local = self.sucesor(previo, accion)
+                if siguiente == estado:
+                    yield previo, accion, costo_local
+
+    def es_resoluble(self, estado):
+        """
+        Si las cantidades son múltiplos de g = mcd(capacidades), vaciar,
+        llenar y pasar agua las dejan múltiplos de g, así que la meta tiene
+        que serlo; y una meta mayor que los dos cubos no cabe en ninguno.
+        Desde (0, 0) estas condiciones bastan para que haya solución.
+
+        """
+        if self.meta in estado:
+            return True
+        g = gcd(*self.maximos)
+        if self.meta > max(self.maximos):
+            return False
+        return g == 0 or any(x % g for x in estado) or self.meta % g == 0
+
+    def estados_meta(self):
+        return [(x0, x1) for x0 in range(self.maximos[0] + 1)
+                for x1 in range(self.maximos[1] + 1) if self.meta in (x0, x1)]
+
+    def codifica(self, estado):
+        return estado[0] * (self.maximos[1] + 1) + estado[1]
+
+    def decodifica(self, codigo):
+        return divmod(codigo, self.maximos[1] + 1)
+
+    def num_codigos(self):
+        return (self.maximos[0] + 1) * (self.maximos[1] + 1)
+
 
 class PbDosBotesCostoAgua(PbDosBotes):
     def calculo_costo_local(self, estado, accion):
@@ -69,24 +125,74 @@ class PbDosBotesCostoAgua(PbDosBotes):
         return costo
 
 
-def el_problema_mas_largo(max_cubo):
-    def costo_solucion(x):
-        plan, _ = busquedas.busqueda_ancho(PbDosBotes(x[0], x[1], x[2]), (0, 0))
-        return 0 if plan is None else plan.costo
+def _costo_plan(plan, nodos_visitados):
+    return 0 if plan is None else plan.costo
+
+
+def distancias_por_volumen(fabrica_problema, x0_max, x1_max, algoritmo):
+    """
+    Costo mínimo para tener cada volumen en alguno de los cubos, con una
+    sola búsqueda exhaustiva desde (0, 0) para todos los volúmenes.
+
+    La búsqueda se hace con una meta imposible y con
+    verifica_resoluble=False, que es lo que evita que se descarte de
+    antemano (ver es_resoluble), así que recorre todo el grafo alcanzable.
+    Como busqueda_ancho y busqueda_costo_uniforme expanden los estados en
+    orden de costo, la primera vez que se expande un estado con cierto
+    volumen es el costo de la solución para esa meta.
+
+    @param fabrica_problema: PbDosBotes o PbDosBotesCostoAgua.
+    @param algoritmo: busquedas.busqueda_ancho para costos unitarios o
+                      busquedas.busqueda_costo_uniforme (Dijkstra).
+    @return: Un diccionario volumen -> costo (solo volúmenes alcanzables).
+
+    """
+    distancias = {}
 
-    return max(((i, j, x) for i in range(2, max_cubo + 1)
-                for j in range(1, i) for x in range(1, i)),
-               key=costo_solucion)
+    def registra(estado, costo):
+        for volumen in estado:
+            distancias.setdefault(volumen, costo)
 
+    estadisticas = busquedas.EstadisticasBusqueda(on_expand=registra)
+    algoritmo(fabrica_problema(x0_max, x1_max, -1, verifica_resoluble=False), (0, 0),
+              estadisticas=estadisticas)
+    return distancias
 
-def el_problema_mas_antiecologico(max_cubo):
-    def costo_solucion(x):
-        plan, _ = busquedas.busqueda_costo_uniforme(PbDosBotesCostoAgua(x[0], x[1], x[2]), (0, 0))
-        return 0 if plan is None else plan.costo
 
-    return max(((i, j, x) for i in range(2, max_cubo + 1)
-                for j in range(1, i) for x in range(1, i)),
-               key=costo_solucion)
+def _mas_costoso(fabrica_problema, algoritmo, max_cubo, procesos, exhaustivo):
+    """
+    El caso (i, j, x) con i > j y x < i cuyo plan desde (0, 0) es el más
+    costoso (el primero en orden si hay empates).
+
+    Con exhaustivo=True se hace una sola búsqueda por par de capacidades
+    (ver distancias_por_volumen); si no, una búsqueda por caso, en
+    paralelo con paralelo.resuelve_lote.
+
+    """
+    casos = [(i, j, x) for i in range(2, max_cubo + 1)
+             for j in range(1, i) for x in range(1, i)]
+    if exhaustivo:
+        tablas = {}
+        costos = []
+        for i, j, x in casos:
+            if (i, j) not in tablas:
+                tablas[i, j] = distancias_por_volumen(fabrica_problema, i, j, algoritmo)
+            costos.append(tablas[i, j].get(x, 0))
+    else:
+        costos = [0] * len(casos)
+        for indice, costo in paralelo.resuelve_lote(fabrica_problema, [(x, (0, 0)) for x in casos],
+                                                    algoritmo, procesos, resumen=_costo_plan):
+            costos[indice] = costo
+    return casos[costos.index(max(costos))]
+
+
+def el_problema_mas_largo(max_cubo, procesos=None, exhaustivo=True):
+    return _mas_costoso(PbDosBotes, busquedas.busqueda_ancho, max_cubo, procesos, exhaustivo)
+
+
+def el_problema_mas_antiecologico(max_cubo, procesos=None, exhaustivo=True):
+    return _mas_costoso(PbDosBotesCostoAgua, busquedas.busqueda_costo_uniforme,
+                        max_cubo, procesos, exhaustivo)
 
 
 if __name__ == "__main__":
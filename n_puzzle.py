@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+n_puzzle.py
+------------
+
+El rompecabezas deslizante de n x n (8 puzzle, 15 puzzle, 24 puzzle, ...)
+con heurísticas de conflicto lineal y de bases de datos de patrones
+aditivas y disjuntas.
+
+"""
+
+import zlib
+
+import busquedas
+import bd_patrones
+
+
+class PbNPuzzle(busquedas.ProblemaBusqueda):
+    """
+    El problema del rompecabezas deslizante de n x n.
+
+    Igual que en el 8 puzzle, el estado es una tupla con las n * n casillas
+    (el 0 es el espacio vacío) seguida de la posición del espacio vacío.
+
+    Las acciones posibles son A = {N,S,E,O}, y mueven el espacio vacío.
+
+    """
+    usa_accion_previa = True
+
+    def __init__(self, n=4, meta=None):
+        self.n = n
+        self.meta = tuple(meta) if meta is not None else tuple(range(1, n * n)) + (0,)
+        self.acciones_legales = {
+            i: ([accion for accion, valida in (('N', i >= n), ('S', i < n * (n - 1)),
+                                               ('E', i % n < n - 1), ('O', i % n > 0)) if valida])
+            for i in range(n * n)}
+        # Las acciones legales sin la que deshace la acción previa
+        self._acciones_tras = {
+            i: {previa: [a for a in legales if previa is None or a != self.accion_inversa(previa)]
+                for previa in (None, 'N', 'S', 'E', 'O')}
+            for i, legales in self.acciones_legales.items()}
+        self.desplazamientos = {'N': -n, 'S': n, 'E': 1, 'O': -1}
+        self.posicion_meta = {ficha: i for i, ficha in enumerate(self.meta)}
+
+    def acciones(self, estado, accion_previa=None):
+        return self._acciones_tras[estado[-1]][accion_previa]
+
+    def sucesor(self, estado, accion):
+        s = list(estado)
+        ind = s[-1]
+        bias = self.desplazamientos[accion]
+        s[ind], s[ind + bias] = s[ind + bias], s[ind]
+        s[-1] += bias
+        return tuple(s), 1
+
+    def terminal(self, estado):
+        return estado[:-1] == self.meta
+
+    def accion_inversa(self, accion):
+        return {'N': 'S', 'S': 'N', 'E': 'O', 'O': 'E'}[accion]
+
+    def es_resoluble(self, estado):
+        # Igual que en el 8 puzzle: la paridad de la permutación respecto a
+        # la meta y la de la distancia del vacío a su lugar van juntas
+        n, meta = self.n, self.posicion_meta
+        if sorted(estado[:-1]) != sorted(self.meta):
+            return False
+        vacio, vacio_meta = estado[-1], meta[0]
+        distancia = abs(vacio // n - vacio_meta // n) + abs(vacio % n - vacio_meta % n)
+        return bd_patrones.paridad_permutacion([meta[f] for f in estado[:-1]]) == distancia % 2
+
+    def estados_meta(self):
+        return [self.meta + (self.meta.index(0),)]
+
+    def codifica(self, estado):
+        # Código de Lehmer de la permutación (la posición del vacío se deduce)
+        return bd_patrones.rango_variacion(estado[:-1], self.n * self.n)
+
+    def decodifica(self, codigo):
+        casillas = tuple(bd_patrones.variacion_de_rango(codigo, self.n * self.n, self.n * self.n))
+        return casillas + (casillas.index(0),)
+
+    def num_codigos(self):
+        return bd_patrones.num_variaciones(self.n * self.n, self.n * self.n)
+
+    def estado_inicial(self, casillas):
+        """
+        Agrega la posición del espacio vacío a una tupla de casillas.
+
+        """
+        casillas = tuple(casillas)
+        return casillas + (casillas.index(0),)
+
+    def dibuja(self, estado):
+        """
+        Dibuja un estado particular
+
+        """
+        ancho = len(str(self.n * self.n - 1))
+        linea = "-" * ((ancho + 3) * self.n + 1) + "\n"
+        cadena = linea
+        for i in range(self.n):
+            for j in range(self.n):
+                ficha = estado[self.n * i + j]
+                cadena += "| " + (str(ficha) if ficha else "").rjust(ancho) + " "
+            cadena += "|\n" + linea
+        return cadena
+
+
+def heuristica_manhattan(problema):
+    """
+    Suma de las distancias de Manhattan de cada ficha a su lugar en la meta.
+
+    @param problema: Un objeto PbNPuzzle.
+    @return: Una función heuristica(nodo).
+
+    """
+    n, meta = problema.n, problema.posicion_meta
+
+    def h_manhattan(nodo):
+        estado = nodo.estado
+        return sum(abs(i // n - meta[estado[i]] // n) + abs(i % n - meta[estado[i]] % n)
+                   for i in range(n * n) if estado[i] != 0)
+    return h_manhattan
+
+
+def _sin_subsecuencia_creciente(valores):
+    """
+    Cuántos valores hay que quitar para que el resto quede en orden creciente
+    (longitud menos la subsecuencia creciente más larga).
+
+    """
+    colas = []
+    for v in valores:
+        i = 0
+        while i < len(colas) and colas[i] < v:
+            i += 1
+        if i == len(colas):
+            colas.append(v)
+        else:
+            colas[i] = v
+    return len(valores) - len(colas)
+
+
+def heuristica_conflicto_lineal(problema):
+    """
+    Manhattan más el conflicto lineal: si dos fichas están en su renglón (o
+    columna) meta pero en orden invertido, una de ellas tiene que salirse
+    del renglón y regresar, lo que cuesta al menos 2 movimientos extra.
+    Por cada línea se suman 2 movimientos por cada ficha que hay que quitar
+    para eliminar todos los conflictos, lo que mantiene la admisibilidad.
+
+    @param problema: Un objeto PbNPuzzle.
+    @return: Una función heuristica(nodo).
+
+    """
+    n, meta = problema.n, problema.posicion_meta
+    h_manhattan = heuristica_manhattan(problema)
+
+    def h_conflicto_lineal(nodo):
+        estado = nodo.estado
+        extra = 0
+        for k in range(n):
+            renglon = [meta[f] % n for f in estado[k * n:(k + 1) * n]
+                       if f != 0 and meta[f] // n == k]
+            columna = [meta[f] // n for f in estado[k:n * n:n]
+                       if f != 0 and meta[f] % n == k]
+            extra += _sin_subsecuencia_creciente(renglon) + _sin_subsecuencia_creciente(columna)
+        return h_manhattan(nodo) + 2 * extra
+    return h_conflicto_lineal
+
+
+def particion_por_omision(n):
+    """
+    Grupos de fichas consecutivas para las bases de datos aditivas: 4-4 en
+    el 8 puzzle, 5-5-5 en el 15 puzzle y grupos de 3 para tableros mayores
+    (para que las tablas se puedan construir en Python en poco tiempo).
+
+    """
+    tam = {3: 4, 4: 5}.get(n, 3)
+    fichas = list(range(1, n * n))
+    return tuple(tuple(fichas[i:i + tam]) for i in range(0, len(fichas), tam))
+
+
+class PatronNPuzzle:
+    """
+    Base de datos de patrones aditiva para un grupo de fichas.
+
+    Solo se cuentan los movimientos de las fichas del grupo (mover otra
+    ficha no cuesta nada), de modo que la suma de las tablas de grupos
+    disjuntos sigue siendo una cota inferior del costo real.
+
+    """
+    def __init__(self, problema, grupo):
+        self.n2 = problema.n * problema.n
+        self.grupo = tuple(grupo)
+        self.destinos = [problema.posicion_meta[f] for f in self.grupo]
+        self.vacio_meta = problema.posicion_meta[0]
+        self.vecinos = [[i + problema.desplazamientos[a] for a in problema.acciones_legales[i]]
+                        for i in range(self.n2)]
+        firma = zlib.crc32(bytes(problema.meta))
+        self.nombre = f"npuzzle_{problema.n}_{'-'.join(map(str, self.grupo))}_{firma:08x}.bdp"
+
+    def rango(self, estado):
+        """
+        Índice del patrón: las posiciones de las fichas del grupo.
+
+        """
+        posiciones = [0] * len(self.grupo)
+        lugar = {f: j for j, f in enumerate(self.grupo)}
+        for i in range(self.n2):
+            if estado[i] in lugar:
+                posiciones[lugar[estado[i]]] = i
+        return bd_patrones.rango_variacion(posiciones, self.n2)
+
+    def construye(self):
+        """
+        Búsqueda a lo ancho 0-1 desde la meta sobre (posiciones del grupo,
+        posición del vacío). Como el vacío es el último elemento de la
+        variación, todos los estados con el mismo patrón quedan juntos y la
+        tabla final es el mínimo de cada bloque.
+
+        """
+        n2, k = self.n2, len(self.grupo)
+        bloque = n2 - k
+        distancias = bytearray(b'\xff') * bd_patrones.num_variaciones(n2, k + 1)
+        inicio = bd_patrones.rango_variacion(self.destinos + [self.vacio_meta], n2)
+        distancias[inicio] = 0
+        capa, costo = [inicio], 0
+        while capa:
+            completa, pila = [], capa
+            while pila:
+                rango = pila.pop()
+                completa.append(rango)
+                *posiciones, vacio = bd_patrones.variacion_de_rango(rango, n2, k + 1)
+                base = rango - rango % bloque
+                for destino in self.vecinos[vacio]:
+                    if destino in posiciones:
+                        continue
+                    siguiente = base + destino - sum(1 for p in posiciones if p < destino)
+                    if distancias[siguiente] == 255:
+                        distancias[siguiente] = costo
+                        pila.append(siguiente)
+            costo += 1
+            capa = []
+            for rango in completa:
+                *posiciones, vacio = bd_patrones.variacion_de_rango(rango, n2, k + 1)
+                for destino in self.vecinos[vacio]:
+                    if destino not in posiciones:
+                        continue
+                    nuevas = [vacio if p == destino else p for p in posiciones]
+                    siguiente = bd_patrones.rango_variacion(nuevas + [destino], n2)
+                    if distancias[siguiente] == 255:
+                        distancias[siguiente] = costo
+                        capa.append(siguiente)
+        tabla = [min(distancias[i:i + bloque]) for i in range(0, len(distancias), bloque)]
+        return bd_patrones.TablaPatrones.desde_distancias(tabla, bits=8)
+
+
+def heuristica_pdb_aditiva(problema, particion=None, directorio=None):
+    """
+    Heurística de bases de datos de patrones aditivas y disjuntas.
+
+    Las tablas se construyen la primera vez y se guardan en disco (ver
+    bd_patrones.obten_tabla), así que las siguientes veces solo se cargan.
+
+    @param problema: Un objeto PbNPuzzle.
+    @param particion: Grupos disjuntos de fichas, por ejemplo
+                      ((1, ..., 7), (8, ..., 15)) para el 7-8 del 15 puzzle.
+                      Por omisión se usa particion_por_omision(n).
+    @param directorio: Dónde se guardan las tablas.
+    @return: Una función heuristica(nodo).
+
+    """
+    patrones = [PatronNPuzzle(problema, grupo)
+                for grupo in (particion or particion_por_omision(problema.n))]
+    tablas = [(patron, bd_patrones.obten_tabla(patron.nombre, patron.construye, directorio))
+              for patron in patrones]
+
+    def h_pdb_aditiva(nodo):
+        return sum(tabla[patron.rango(nodo.estado)] for patron, tabla in tablas)
+    return h_pdb_aditiva
+
+
+if __name__ == "__main__":
+
+    problema = PbNPuzzle(4)
+    s0 = problema.estado_inicial((5, 1, 2, 4, 9, 6, 3, 8, 13, 15, 10, 11, 14, 0, 7, 12))
+    print(problema.dibuja(s0))
+
+    print("---------- Utilizando IDA* con conflicto lineal -------------")
+    plan, nodos_visitados = busquedas.busqueda_IDA_estrella(problema, s0, heuristica_conflicto_lineal(problema))
+    print(plan)
+    print(f"Explorando {nodos_visitados} nodos\n\n")
+
+    print("---------- Utilizando A* con PDB aditiva 5-5-5 -------------")
+    plan, nodos_visitados = busquedas.busqueda_A_estrella(problema, s0, heuristica_pdb_aditiva(problema))
+    print(plan)
+    print(f"Explorando {nodos_visitados} nodos\n\n")
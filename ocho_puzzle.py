@@ -13,6 +13,13 @@ __author__ = 'juliowaissman'
 
 
 import busquedas
+import bd_patrones
+import oraculo
+
+try:
+    import numpy as np
+except ImportError:  # Sin numpy no hay versiones por lotes
+    np = None
 
 
 class Pb8Puzzle(busquedas.ProblemaBusqueda):
@@ -38,8 +45,17 @@ class Pb8Puzzle(busquedas.ProblemaBusqueda):
     Las acciones posibles son A = {N,S,E,O}
 
     """
-    def __init__(self, meta = (1, 2, 3, 4, 5, 6, 7, 8, 0)):
+    usa_accion_previa = True
+
+    def __init__(self, meta = (1, 2, 3, 4, 5, 6, 7, 8, 0), simetrias=False):
+        """
+        @param meta: Las 9 casillas de la meta.
+        @param simetrias: Si es True las búsquedas guardan un solo estado
+                          por clase de simetría (ver canonico).
+
+        """
         self.meta = meta[:]
+        self.usa_simetrias = simetrias
         self.acciones_legales = {0: ['S', 'E'],
                          1: ['S', 'E', 'O'],
                          2: ['S', 'O'],
@@ -49,9 +65,34 @@ class Pb8Puzzle(busquedas.ProblemaBusqueda):
                          6: ['N', 'E'],
                          7: ['N', 'E', 'O'],
                          8: ['N', 'O']}
-
-    def acciones(self, estado):
-        return self.acciones_legales[estado[-1]]
+        # Las acciones legales sin la que deshace la acción previa
+        self._acciones_tras = {
+            i: {previa: [a for a in legales if previa is None or a != self.accion_inversa(previa)]
+                for previa in (None, 'N', 'S', 'E', 'O')}
+            for i, legales in self.acciones_legales.items()}
+
+        # Reflejos y giros del tablero que dejan el vacío de la meta en su
+        # lugar; con las fichas renombradas según la meta, llevan la meta a
+        # sí misma y movimientos a movimientos. Cada uno se guarda como
+        # (origen, renombre, destino): la casilla j del estado simétrico
+        # viene de origen[j], la ficha f se renombra como renombre[f] y el
+        # vacío en i pasa a destino[i].
+        self._simetrias = []
+        vacio = self.meta.index(0)
+        for mapa in (lambda r, c: (c, r), lambda r, c: (2 - r, c), lambda r, c: (r, 2 - c),
+                     lambda r, c: (2 - r, 2 - c), lambda r, c: (2 - c, 2 - r),
+                     lambda r, c: (c, 2 - r), lambda r, c: (2 - c, r)):
+            destino = [3 * mapa(i // 3, i % 3)[0] + mapa(i // 3, i % 3)[1] for i in range(9)]
+            if destino[vacio] != vacio:
+                continue
+            origen = [destino.index(j) for j in range(9)]
+            renombre = [0] * 9
+            for i, ficha in enumerate(self.meta):
+                renombre[ficha] = self.meta[destino[i]]
+            self._simetrias.append((origen, renombre, destino))
+
+    def acciones(self, estado, accion_previa=None):
+        return self._acciones_tras[estado[-1]][accion_previa]
 
     def sucesor(self, estado, accion):
         costo_local = 1
@@ -68,6 +109,64 @@ class Pb8Puzzle(busquedas.ProblemaBusqueda):
     def terminal(self, estado):
         return estado[:-1] == self.meta
 
+    def accion_inversa(self, accion):
+        return {'N': 'S', 'S': 'N', 'E': 'O', 'O': 'E'}[accion]
+
+    def es_resoluble(self, estado):
+        # Cada movimiento intercambia el vacío con una ficha (cambia la
+        # paridad de la permutación respecto a la meta) y mueve el vacío una
+        # casilla (cambia la paridad de su distancia a su lugar en la meta),
+        # así que las dos paridades coinciden en todo estado alcanzable
+        if sorted(estado[:-1]) != sorted(self.meta):
+            return False
+        lugar = {ficha: i for i, ficha in enumerate(self.meta)}
+        vacio, vacio_meta = estado[-1], lugar[0]
+        distancia = abs(vacio // 3 - vacio_meta // 3) + abs(vacio % 3 - vacio_meta % 3)
+        return bd_patrones.paridad_permutacion([lugar[f] for f in estado[:-1]]) == distancia % 2
+
+    def estados_meta(self):
+        return [self.meta + (self.meta.index(0),)]
+
+    def codifica(self, estado):
+        # Código de Lehmer de la permutación (la posición del vacío se deduce)
+        return bd_patrones.rango_variacion(estado[:-1], 9)
+
+    def decodifica(self, codigo):
+        casillas = tuple(bd_patrones.variacion_de_rango(codigo, 9, 9))
+        return casillas + (casillas.index(0),)
+
+    def num_codigos(self):
+        return bd_patrones.num_variaciones(9, 9)
+
+    def canonico(self, estado):
+        # El menor entre el estado y sus simétricos (un reflejo con la meta
+        # por omisión, los 8 si el vacío de la meta está en el centro)
+        return min([estado] + [tuple(renombre[estado[i]] for i in origen) + (destino[estado[-1]],)
+                               for origen, renombre, destino in self._simetrias])
+
+    def sucesores_lote(self, estados):
+        """
+        Versión vectorizada de sucesor: para cada dirección se toman los
+        renglones donde el vacío se puede mover y se intercambian las dos
+        casillas en todos a la vez.
+
+        """
+        vacios = estados[:, -1]
+        hijos, padres, acciones = [], [], []
+        for accion, bias, legal in (('N', -3, vacios >= 3), ('S', 3, vacios < 6),
+                                    ('E', 1, vacios % 3 < 2), ('O', -1, vacios % 3 > 0)):
+            renglones = np.nonzero(legal)[0]
+            s = estados[renglones].copy()
+            r, ind = np.arange(len(renglones)), s[:, -1]
+            s[r, ind] = s[r, ind + bias]
+            s[r, ind + bias] = 0
+            s[:, -1] += bias
+            hijos.append(s)
+            padres.append(renglones)
+            acciones.extend([accion] * len(renglones))
+        hijos = np.concatenate(hijos)
+        return hijos, np.concatenate(padres), acciones, np.ones(len(hijos), dtype=int)
+
     @staticmethod
     def dibuja(estado):
         """
@@ -105,6 +204,44 @@ def h_2(nodo):
                 for i in range(9) if nodo.estado[i] != 0])
 
 
+def _h_1_delta(h_padre, estado_padre, accion, estado_hijo):
+    # Solo cambian las casillas donde estaba y donde quedó el vacío
+    h = h_padre
+    for i in (estado_padre[-1], estado_hijo[-1]):
+        if i != 0:
+            h += (i != estado_hijo[i]) - (i != estado_padre[i])
+    return h
+
+
+def _h_2_delta(h_padre, estado_padre, accion, estado_hijo):
+    # La única ficha que se mueve pasa de donde quedó el vacío a donde estaba
+    origen, destino = estado_hijo[-1], estado_padre[-1]
+    ficha = estado_padre[origen]
+    return (h_padre
+            + abs(destino % 3 - ficha % 3) + abs(destino // 3 - ficha // 3)
+            - abs(origen % 3 - ficha % 3) - abs(origen // 3 - ficha // 3))
+
+
+h_1.delta = _h_1_delta
+h_2.delta = _h_2_delta
+
+
+if np is not None:
+    _POSICIONES = np.arange(9)
+
+    def _h_1_lote(estados):
+        return (estados[:, 1:9] != _POSICIONES[1:9]).sum(axis=1)
+
+    def _h_2_lote(estados):
+        casillas = estados[:, :9]
+        distancias = (np.abs(_POSICIONES % 3 - casillas % 3) +
+                      np.abs(_POSICIONES // 3 - casillas // 3))
+        return np.where(casillas != 0, distancias, 0).sum(axis=1)
+
+    h_1.lote = _h_1_lote
+    h_2.lote = _h_2_lote
+
+
 def probando(pos_ini):
     """
     Muestra el resultado de aplicar un tipo de búsqeda
@@ -127,6 +264,11 @@ def probando(pos_ini):
     print(plan)
     print(f"Explorando {nodos_visitados} nodos\n\n")
 
+    print("---------- Utilizando BFS bidireccional -------------")
+    plan, nodos_visitados = busquedas.busqueda_ancho_bidireccional(problema, s0)
+    print(plan)
+    print(f"Explorando {nodos_visitados} nodos\n\n")
+
     print("---------- Utilizando DFS -------------")
     plan, nodos_visitados = busquedas.busqueda_profundo(problema, s0, 50)
     print(plan)
@@ -150,9 +292,20 @@ def probando(pos_ini):
     print("Explorando {} nodos".format(nodos_visitados))
 
     print("---------- Utilizando A* con h2 -------------")
-    plan, nodos_visitados = busquedas.busqueda_A_estrella(problema, s0, h_2)
+    estadisticas = busquedas.EstadisticasBusqueda(medir_tiempos=True)
+    plan, nodos_visitados = busquedas.busqueda_A_estrella(problema, s0, h_2,
+                                                          estadisticas=estadisticas)
     print(plan)
     print("Explorando {} nodos".format(nodos_visitados))
+    print(estadisticas)
+
+    print("---------- Utilizando IDA* con h2 -------------")
+    plan, nodos_visitados = busquedas.busqueda_IDA_estrella(problema, s0, h_2)
+    print(plan)
+    print("Explorando {} nodos".format(nodos_visitados))
+
+    print("---------- Utilizando el oráculo -------------")
+    print(oraculo.Oraculo(problema).plan(s0))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+oraculo.py
+----------
+
+Oráculos de distancia exacta para problemas con espacios de estados
+pequeños (el 8 puzzle completo tiene 181,440 estados alcanzables, los dos
+botes unos cuantos miles).
+
+Se recorre todo el espacio una sola vez con una búsqueda a lo ancho hacia
+atrás desde las metas, por capas y repartida en varios procesos que
+escriben en una misma tabla en memoria compartida, indexada por
+problema.codifica. La tabla se guarda en disco (ver bd_patrones) y a
+partir de ahí un plan óptimo se obtiene bajando por la tabla en tiempo
+proporcional a su longitud, y la tabla sirve como heurística perfecta.
+
+    oraculo = Oraculo(ocho_puzzle.Pb8Puzzle())
+    oraculo.distancia(s0)
+    nodo = oraculo.plan(s0)
+    busquedas.busqueda_A_estrella(problema, s0, oraculo.heuristica())
+
+"""
+
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import busquedas
+import bd_patrones
+
+
+# Sin distancia: el estado no llega a ninguna meta (o el código no es de
+# un estado válido)
+SIN_DISTANCIA = 255
+
+# Capas con menos estados que estos se expanden en el proceso principal
+_CAPA_MINIMA = 1024
+
+# La tabla compartida y el problema en cada proceso de trabajo
+_memoria = None
+_problema = None
+
+
+def _expande(problema, distancias, codigos, nivel):
+    """
+    Marca con nivel a los predecesores todavía sin distancia de los estados
+    con los códigos dados, y regresa sus códigos.
+
+    """
+    nuevos = []
+    for codigo in codigos:
+        for previo, _, costo_local in problema.predecesores(problema.decodifica(codigo)):
+            if costo_local != 1:
+                raise ValueError("El oráculo solo sirve para problemas con costos unitarios.")
+            indice = problema.codifica(previo)
+            if distancias[indice] == SIN_DISTANCIA:
+                distancias[indice] = nivel
+                nuevos.append(indice)
+    return nuevos
+
+
+def _inicia_trabajador(problema, nombre):
+    global _memoria, _problema
+    _memoria = shared_memory.SharedMemory(name=nombre)
+    _problema = problema
+
+
+def _expande_bloque(codigos, nivel):
+    return _expande(_problema, _memoria.buf, codigos, nivel)
+
+
+def construye_tabla(problema, procesos=None, tam_bloque=None):
+    """
+    Distancia a la meta de todos los estados, con una búsqueda a lo ancho
+    hacia atrás sincronizada por capas.
+
+    Cada capa se reparte en bloques entre los procesos, que escriben la
+    distancia de los predecesores nuevos directamente en la tabla
+    compartida. Dos procesos pueden encontrar el mismo predecesor a la vez,
+    pero los dos escriben el mismo nivel, así que basta con quitar los
+    repetidos de la siguiente capa.
+
+    @param problema: Un ProblemaBusqueda con costos unitarios que implemente
+                     codifica, decodifica, num_codigos, estados_meta y
+                     predecesores (o accion_inversa).
+    @param procesos: Número de procesos (os.cpu_count() por omisión). Con
+                     procesos=1 todo se hace en este mismo proceso.
+    @param tam_bloque: Estados por tarea; por omisión unas cuatro tareas
+                       por proceso en cada capa.
+    @return: Una bd_patrones.TablaPatrones de 8 bits con la distancia de
+             cada código (SIN_DISTANCIA si no llega a la meta).
+
+    """
+    procesos = procesos or os.cpu_count() or 1
+    num_codigos = problema.num_codigos()
+    memoria = shared_memory.SharedMemory(create=True, size=num_codigos)
+    try:
+        distancias = memoria.buf
+        distancias[:num_codigos] = bytes([SIN_DISTANCIA]) * num_codigos
+        capa = list({problema.codifica(meta) for meta in problema.estados_meta()})
+        for codigo in capa:
+            distancias[codigo] = 0
+        grupo = (ProcessPoolExecutor(max_workers=procesos, initializer=_inicia_trabajador,
+                                     initargs=(problema, memoria.name))
+                 if procesos > 1 else None)
+        try:
+            nivel = 0
+            while capa and nivel < SIN_DISTANCIA - 1:
+                nivel += 1
+                if grupo is None or len(capa) < _CAPA_MINIMA:
+                    capa = _expande(problema, distancias, capa, nivel)
+                    continue
+                tam = tam_bloque or max(1, -(-len(capa) // (4 * procesos)))
+                futuros = [grupo.submit(_expande_bloque, capa[i:i + tam], nivel)
+                           for i in range(0, len(capa), tam)]
+                capa = list({codigo for futuro in futuros for codigo in futuro.result()})
+        finally:
+            if grupo is not None:
+                grupo.shutdown()
+        tabla = bd_patrones.TablaPatrones.desde_distancias(distancias[:num_codigos], bits=8)
+    finally:
+        memoria.close()
+        memoria.unlink()
+    return tabla
+
+
+def nombre_tabla(problema):
+    """
+    Nombre del archivo de la tabla de un problema: la clase, el número de
+    códigos y una firma de las metas.
+
+    """
+    firma = zlib.crc32(repr(sorted(problema.estados_meta())).encode())
+    return f"oraculo_{type(problema).__name__}_{problema.num_codigos()}_{firma:08x}.bdp"
+
+
+class Oraculo:
+    """
+    Distancias exactas a la meta de todos los estados de un problema.
+
+    La tabla se construye la primera vez con construye_tabla y se guarda en
+    disco, así que las siguientes veces solo se carga con mmap (y varios
+    procesos comparten una sola copia en memoria).
+
+    """
+    def __init__(self, problema, directorio=None, procesos=None):
+        """
+        @param problema: El problema (ver construye_tabla).
+        @param directorio: Dónde se guarda la tabla
+                           (bd_patrones.DIRECTORIO_TABLAS por omisión).
+        @param procesos: Procesos para construir la tabla si no existe.
+
+        """
+        self.problema = problema
+        self.tabla = bd_patrones.obten_tabla(
+            nombre_tabla(problema), lambda: construye_tabla(problema, procesos), directorio)
+
+    def distancia(self, estado):
+        """
+        Número mínimo de acciones para llegar de estado a una meta.
+
+        @return: Un entero, o None si desde estado no se llega a la meta.
+
+        """
+        distancia = self.tabla[self.problema.codifica(estado)]
+        return None if distancia == SIN_DISTANCIA else distancia
+
+    def plan(self, s0):
+        """
+        Plan óptimo desde s0 sin buscar: en cada paso se toma una acción que
+        lleva a un estado con distancia una unidad menor.
+
+        @return: El NodoBusqueda con el plan (como en las búsquedas), o
+                 None si desde s0 no se llega a la meta.
+
+        """
+        problema, tabla, codifica = self.problema, self.tabla, self.problema.codifica
+        distancia = tabla[codifica(s0)]
+        if distancia == SIN_DISTANCIA:
+            return None
+        nodo = busquedas.NodoBusqueda(s0)
+        while distancia > 0:
+            for accion in problema.acciones(nodo.estado):
+                estado, costo_local = problema.sucesor(nodo.estado, accion)
+                if tabla[codifica(estado)] == distancia - 1:
+                    break
+            nodo = busquedas.NodoBusqueda(estado, accion, nodo, costo_local)
+            distancia -= 1
+        return nodo
+
+    def heuristica(self):
+        """
+        La distancia exacta como heurística (perfecta, y por lo tanto
+        admisible y consistente): A* con ella solo expande los estados de
+        un plan óptimo. Los estados sin distancia valen infinito.
+
+        @return: Una función heuristica(nodo).
+
+        """
+        tabla, codifica = self.tabla, self.problema.codifica
+
+        def h_oraculo(nodo):
+            distancia = tabla[codifica(nodo.estado)]
+            return float('inf') if distancia == SIN_DISTANCIA else distancia
+        return h_oraculo
+
+
+if __name__ == "__main__":
+
+    import ocho_puzzle
+    import dos_botes
+
+    problema = ocho_puzzle.Pb8Puzzle()
+    oraculo = Oraculo(problema)
+    s0 = (5, 1, 3, 4, 0, 2, 6, 7, 8, 4)
+    print(problema.dibuja(s0))
+    print(f"Distancia a la meta: {oraculo.distancia(s0)}")
+    print(oraculo.plan(s0))
+
+    problema = dos_botes.PbDosBotes(7, 4, 2)
+    oraculo = Oraculo(problema)
+    print(f"Dos botes (7, 4) para tener 2 litros: {oraculo.plan((0, 0))}")
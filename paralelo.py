@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+paralelo.py
+-----------
+
+Búsquedas en varios procesos.
+
+resuelve_lote reparte muchos problemas independientes (por ejemplo todos
+los problemas de los dos botes hasta cierto tamaño, o un lote de cubos
+revueltos) entre los núcleos de la máquina, y busqueda_A_estrella_paralela
+reparte una sola búsqueda difícil.
+
+"""
+
+import heapq
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import reduce
+from operator import getitem, xor
+from queue import Empty
+from time import perf_counter, sleep
+
+import busquedas
+
+
+# Problemas ya construidos en este proceso, por (fabrica, argumentos)
+_problemas = {}
+
+
+def _problema(fabrica_problema, argumentos):
+    llave = (fabrica_problema, argumentos)
+    if llave not in _problemas:
+        _problemas[llave] = fabrica_problema(*argumentos)
+    return _problemas[llave]
+
+
+def _resuelve_bloque(fabrica_problema, algoritmo, resumen, bloque):
+    """
+    Resuelve un bloque de instancias (en un proceso de trabajo).
+
+    """
+    resultados = []
+    for indice, argumentos, s0 in bloque:
+        nodo, nodos_visitados = algoritmo(_problema(fabrica_problema, argumentos), s0)
+        resultados.append((indice, (nodo, nodos_visitados) if resumen is None
+                           else resumen(nodo, nodos_visitados)))
+    return resultados
+
+
+def resuelve_lote(fabrica_problema, instancias, algoritmo, procesos=None,
+                  tam_bloque=None, resumen=None):
+    """
+    Resuelve muchas instancias independientes en un grupo de procesos.
+
+    Cada proceso construye cada problema una sola vez con
+    fabrica_problema(*argumentos) y lo reutiliza para todas las instancias
+    con los mismos argumentos, de modo que las tablas grandes (bases de
+    datos de patrones, tablas de movimientos) no viajan con cada tarea.
+    Las instancias se mandan en bloques y los resultados se van
+    regresando conforme terminan (no en orden).
+
+    @param fabrica_problema: Una clase o función de nivel de módulo que
+                             construye el problema.
+    @param instancias: Un iterable de tuplas (argumentos, s0), donde
+                       argumentos es una tupla para fabrica_problema.
+    @param algoritmo: Una función de nivel de módulo algoritmo(problema, s0)
+                      que regrese (nodo, nodos_visitados), como las
+                      búsquedas de busquedas.py; para pasar más parámetros
+                      se puede usar functools.partial, por ejemplo
+                      partial(busquedas.busqueda_A_estrella, heuristica=h_2).
+    @param procesos: Número de procesos (os.cpu_count() por omisión). Con
+                     procesos=1 todo se resuelve en este mismo proceso.
+    @param tam_bloque: Instancias por tarea; por omisión se hacen unas
+                       cuatro tareas por proceso.
+    @param resumen: Función opcional de nivel de módulo resumen(nodo,
+                    nodos_visitados) que se aplica en el proceso de trabajo,
+                    para regresar solo lo necesario (por ejemplo el costo)
+                    en lugar de toda la cadena de nodos.
+
+    @return: Un generador de (indice, resultado), donde indice es la
+             posición de la instancia en instancias y resultado es
+             (nodo, nodos_visitados) o lo que regrese resumen.
+
+    """
+    tareas = [(indice, tuple(argumentos), s0)
+              for indice, (argumentos, s0) in enumerate(instancias)]
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        yield from _resuelve_bloque(fabrica_problema, algoritmo, resumen, tareas)
+        return
+
+    tam_bloque = tam_bloque or max(1, -(-len(tareas) // (4 * procesos)))
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        futuros = [grupo.submit(_resuelve_bloque, fabrica_problema, algoritmo, resumen,
+                                tareas[i:i + tam_bloque])
+                   for i in range(0, len(tareas), tam_bloque)]
+        for futuro in as_completed(futuros):
+            yield from futuro.result()
+
+
+# ------------------------------------------------------------
+#  A* distribuido por hash (HDA*)
+# ------------------------------------------------------------
+
+class Zobrist:
+    """
+    Hash de Zobrist para estados que son tuplas de enteros pequeños (el 8
+    puzzle, el N puzzle, el cubo): un número aleatorio de 64 bits por cada
+    pareja (posición, valor), y el hash del estado es el xor de los de sus
+    casillas. Con la misma semilla da lo mismo en todos los procesos, a
+    diferencia de hash() con cadenas.
+
+    """
+    def __init__(self, longitud, valores=256, semilla=0):
+        azar = random.Random(semilla)
+        self.tablas = [[azar.getrandbits(64) for _ in range(valores)] for _ in range(longitud)]
+
+    def __call__(self, estado):
+        return reduce(xor, map(getitem, self.tablas, estado), 0)
+
+
+def _dueno_por_omision(s0):
+    "Zobrist si el estado es una tupla de enteros de un byte, si no hash()"
+    if isinstance(s0, tuple) and all(isinstance(x, int) and 0 <= x < 256 for x in s0):
+        return Zobrist(len(s0))
+    return hash
+
+
+def _trabajador_hda(indice, problema, heuristica, dueno, entradas, salida, compartido,
+                    tam_lote, pasos):
+    """
+    Un proceso de HDA*: tiene su propia frontera y sus visitados con los
+    estados que le tocan, expande de pasos en pasos, y manda los hijos
+    ajenos a su dueño en lotes de tam_lote.
+
+    """
+    incumbente, ganador, alto, inactivos, enviados, recibidos, expandidos = compartido
+    num = len(entradas)
+    clave = busquedas._funcion_clave(problema, simetrias=False)
+    entrada = entradas[indice]
+    frontera, visitados, buzones = [], {}, [[] for _ in range(num)]
+    contador = 0
+    meta = pendiente = None
+    datos = dict(trabajador=indice, expandidos=0, generados=0, duplicados=0,
+                 nodos_enviados=0, nodos_recibidos=0, lotes_enviados=0,
+                 segundos_comunicacion=0.0, segundos_inactivo=0.0)
+
+    def inserta(estado, costo, padre, accion):
+        nonlocal contador
+        llave = clave(estado)
+        previo = visitados.get(llave)
+        if previo is not None and previo[0] <= costo:
+            datos['duplicados'] += 1
+            return
+        h = heuristica(busquedas.NodoBusqueda(estado)) if previo is None else previo[3]
+        visitados[llave] = [costo, padre, accion, h]
+        contador += 1
+        heapq.heappush(frontera, (costo + h, -costo, contador, estado))
+
+    def recibe(lote):
+        # Después del alto llegan preguntas (tuplas) en lugar de lotes
+        nonlocal pendiente
+        if isinstance(lote, tuple):
+            pendiente = lote
+            return
+        inactivos[indice] = 0
+        recibidos[indice] += 1
+        datos['nodos_recibidos'] += len(lote)
+        for estado, costo, padre, accion in lote:
+            inserta(estado, costo, padre, accion)
+
+    def manda(destino):
+        inicio = perf_counter()
+        enviados[indice] += 1
+        entradas[destino].put(buzones[destino])
+        datos['nodos_enviados'] += len(buzones[destino])
+        datos['lotes_enviados'] += 1
+        buzones[destino] = []
+        datos['segundos_comunicacion'] += perf_counter() - inicio
+
+    while not alto.value and pendiente is None:
+        inicio = perf_counter()
+        while pendiente is None:
+            try:
+                lote = entrada.get_nowait()
+            except Empty:
+                break
+            recibe(lote)
+        datos['segundos_comunicacion'] += perf_counter() - inicio
+
+        cota = incumbente.value
+        trabajo = False
+        for _ in range(pasos):
+            while frontera:
+                f, menos_costo, _, estado = frontera[0]
+                if visitados[clave(estado)][0] < -menos_costo:
+                    heapq.heappop(frontera)
+                    continue
+                break
+            if not frontera or frontera[0][0] >= cota:
+                break
+            _, menos_costo, _, estado = heapq.heappop(frontera)
+            costo = -menos_costo
+            trabajo = True
+            datos['expandidos'] += 1
+            if problema.terminal(estado):
+                with incumbente.get_lock():
+                    if costo < incumbente.value:
+                        incumbente.value = costo
+                        ganador.value = indice
+                        meta = estado
+                cota = incumbente.value
+                continue
+            for accion in problema.acciones(estado):
+                hijo, costo_local = problema.sucesor(estado, accion)
+                datos['generados'] += 1
+                destino = dueno(hijo) % num
+                if destino == indice:
+                    inserta(hijo, costo + costo_local, estado, accion)
+                else:
+                    buzones[destino].append((hijo, costo + costo_local, estado, accion))
+                    if len(buzones[destino]) >= tam_lote:
+                        manda(destino)
+        expandidos[indice] = datos['expandidos']
+
+        if not trabajo:
+            for destino in range(num):
+                if buzones[destino]:
+                    manda(destino)
+            inactivos[indice] = 1
+            inicio = perf_counter()
+            try:
+                lote = entrada.get(timeout=0.01)
+            except Empty:
+                datos['segundos_inactivo'] += perf_counter() - inicio
+                continue
+            datos['segundos_inactivo'] += perf_counter() - inicio
+            recibe(lote)
+
+    # Ya terminó la búsqueda: se contestan preguntas para reconstruir el plan
+    while True:
+        mensaje, pendiente = pendiente or entrada.get(), None
+        if isinstance(mensaje, list):
+            continue
+        if mensaje[0] == 'padre':
+            _, padre, accion, _ = visitados[clave(mensaje[1])]
+            salida.put((padre, accion))
+        elif mensaje[0] == 'meta':
+            salida.put(meta)
+        else:
+            salida.put(datos)
+            return
+
+
+def busqueda_A_estrella_paralela(problema, s0, heuristica, procesos=None, dueno=None,
+                                 tam_lote=64, pasos=32, reporte=None, estadisticas=None,
+                                 max_nodos=None, max_segundos=None, cancelacion=None):
+    """
+    A* distribuido por hash (HDA*) en varios procesos.
+
+    Cada estado tiene un dueño, dueno(estado) % procesos, que es el único
+    que lo guarda, lo detecta como repetido y lo expande. Cada proceso
+    expande su propia frontera en orden de f y manda los hijos que no le
+    tocan a su dueño en lotes por colas de multiprocessing. La primera
+    meta que se expande da una cota (el incumbente) compartida; la
+    búsqueda termina cuando ningún proceso tiene nodos con f menor a la
+    cota y no queda ningún lote en camino, así que con una heurística
+    admisible el plan es óptimo. El plan se reconstruye preguntando a cada
+    dueño por el padre de cada estado.
+
+    Los procesos se crean con fork si el sistema lo permite, así que el
+    problema y la heurística pueden ser cualquier objeto (por ejemplo una
+    función anidada); con otros métodos de inicio deben poderse serializar
+    con pickle.
+
+    @param problema: Un objeto de una clase heredada de ProblemaBusqueda.
+    @param s0: El estado inicial.
+    @param heuristica: Una función heuristica(nodo) admisible.
+    @param procesos: Número de procesos (os.cpu_count() por omisión).
+    @param dueno: Función dueno(estado) que regresa un entero; por omisión
+                  un Zobrist si los estados son tuplas de enteros de un
+                  byte, y hash() si no.
+    @param tam_lote: Nodos por lote que se manda a otro proceso.
+    @param pasos: Nodos que expande un proceso antes de revisar su cola.
+    @param reporte: Una lista opcional donde se agrega un diccionario por
+                    proceso con sus expandidos, generados, duplicados,
+                    nodos y lotes enviados y recibidos, y segundos en
+                    comunicación y sin trabajo (para ver el balance).
+    @param estadisticas: Un EstadisticasBusqueda opcional a actualizar con
+                         la suma de los procesos.
+    @param max_nodos: Máximo de nodos a expandir entre todos los procesos.
+    @param max_segundos: Tiempo máximo en segundos.
+    @param cancelacion: Un threading.Event (o cualquier objeto con is_set())
+                        para cancelar la búsqueda desde otro hilo.
+
+    @return Un ResultadoBusqueda, como busquedas.busqueda_A_estrella. Si
+            se interrumpe y ya había una meta, mejor tiene su plan (que
+            puede no ser óptimo).
+
+    """
+    est = estadisticas if estadisticas is not None else busquedas.EstadisticasBusqueda()
+    if problema.verifica_resoluble and not problema.es_resoluble(s0):
+        return busquedas.ResultadoBusqueda(None, 0, 'sin solucion', None, est)
+    procesos = procesos or os.cpu_count() or 1
+    dueno = dueno or _dueno_por_omision(s0)
+    contexto = (multiprocessing.get_context('fork')
+                if 'fork' in multiprocessing.get_all_start_methods()
+                else multiprocessing.get_context())
+    incumbente = contexto.Value('d', float('inf'))
+    ganador = contexto.Value('i', -1, lock=False)
+    alto = contexto.Value('b', 0, lock=False)
+    inactivos = contexto.Array('b', procesos, lock=False)
+    enviados = contexto.Array('q', procesos + 1, lock=False)
+    recibidos = contexto.Array('q', procesos, lock=False)
+    expandidos = contexto.Array('q', procesos, lock=False)
+    compartido = (incumbente, ganador, alto, inactivos, enviados, recibidos, expandidos)
+    entradas = [contexto.Queue() for _ in range(procesos)]
+    salida = contexto.Queue()
+    trabajadores = [contexto.Process(target=_trabajador_hda, daemon=True,
+                                     args=(i, problema, heuristica, dueno, entradas, salida,
+                                           compartido, tam_lote, pasos))
+                    for i in range(procesos)]
+    limite = None if max_segundos is None else perf_counter() + max_segundos
+
+    def pregunta(trabajador, mensaje):
+        entradas[trabajador].put(mensaje)
+        while True:
+            try:
+                return salida.get(timeout=1)
+            except Empty:
+                if not trabajadores[trabajador].is_alive():
+                    raise RuntimeError(f"El proceso {trabajador} de HDA* terminó con error.")
+
+    def plan(meta):
+        acciones, estado = [], meta
+        while estado != s0:
+            estado, accion = pregunta(dueno(estado) % procesos, ('padre', estado))
+            acciones.append(accion)
+        nodo = busquedas.NodoBusqueda(s0)
+        for accion in reversed(acciones):
+            estado_sucesor, costo_local = problema.sucesor(nodo.estado, accion)
+            nodo = busquedas.NodoBusqueda(estado_sucesor, accion, nodo, costo_local)
+        return nodo
+
+    for trabajador in trabajadores:
+        trabajador.start()
+    try:
+        enviados[procesos] += 1
+        entradas[dueno(s0) % procesos].put([(s0, 0, None, None)])
+        razon, anterior = None, None
+        while razon is None:
+            sleep(0.002)
+            if any(not trabajador.is_alive() for trabajador in trabajadores):
+                raise RuntimeError("Un proceso de HDA* terminó con error.")
+            # Terminación: todos sin trabajo y ningún lote en camino, visto
+            # igual dos veces seguidas
+            foto = (tuple(inactivos), sum(enviados), sum(recibidos))
+            if all(foto[0]) and foto[1] == foto[2] and foto == anterior:
+                break
+            anterior = foto
+            if max_nodos is not None and sum(expandidos) >= max_nodos:
+                razon = 'max_nodos'
+            elif limite is not None and perf_counter() >= limite:
+                razon = 'max_segundos'
+            elif cancelacion is not None and cancelacion.is_set():
+                razon = 'cancelada'
+        alto.value = 1
+
+        meta = pregunta(ganador.value, ('meta',)) if ganador.value >= 0 else None
+        nodo = plan(meta) if meta is not None else None
+        datos = [pregunta(i, ('fin',)) for i in range(procesos)]
+    finally:
+        alto.value = 1
+        for trabajador in trabajadores:
+            trabajador.join(timeout=1)
+            if trabajador.is_alive():
+                trabajador.terminate()
+
+    for dato in datos:
+        est.expandidos += dato['expandidos']
+        est.generados += dato['generados']
+        est.duplicados += dato['duplicados']
+    if reporte is not None:
+        reporte.extend(datos)
+    nodos_visitados = sum(dato['expandidos'] for dato in datos)
+    if razon is not None:
+        return busquedas.ResultadoBusqueda(None, nodos_visitados, razon, nodo, est)
+    return busquedas.ResultadoBusqueda(nodo, nodos_visitados,
+                                       'resuelto' if nodo is not None else 'sin solucion',
+                                       nodo, est)
@@ -8,7 +8,17 @@ Tarea sobre búsquedas, donde lo que es importante es crear nuevas heurísticas
 
 """
 
+from functools import lru_cache
+from itertools import permutations, product
+from operator import itemgetter
+
 import busquedas
+import bd_patrones
+
+try:
+    import numpy as np
+except ImportError:  # Sin numpy no hay versiones por lotes
+    np = None
 
 
 
@@ -126,6 +136,52 @@ def h_2_camion_magico(nodo):
 #  Desarrolla el modelo del cubo de Rubik
 # ------------------------------------------------------------
 
+def _coordenadas_estampas():
+    """
+    Centro de cada una de las 54 estampas en el espacio, con x de L a R,
+    y de D a U y z de B a F (los centros de las caras quedan a 1.5 del
+    origen). U se ve desde arriba con el renglón 0 atrás, L, F, R y B
+    desde afuera con el renglón 0 arriba, y D desde abajo con el renglón
+    0 al frente.
+
+    """
+    por_cara = (
+        lambda r, c: (c - 1, 1.5, r - 1),   # U
+        lambda r, c: (-1.5, 1 - r, c - 1),  # L
+        lambda r, c: (c - 1, 1 - r, 1.5),   # F
+        lambda r, c: (1.5, 1 - r, 1 - c),   # R
+        lambda r, c: (1 - c, 1 - r, -1.5),  # B
+        lambda r, c: (c - 1, -1.5, 1 - r),  # D
+    )
+    return [por_cara[i // 9](i % 9 // 3, i % 3) for i in range(54)]
+
+
+@lru_cache(maxsize=None)
+def _simetrias_cubo():
+    """
+    Las 48 simetrías del cubo (24 rotaciones y sus reflejos), como pares
+    (origen, colores): la estampa que queda en la posición j viene de
+    origen[j], y su color c se renombra como colores[c] para que los
+    centros vuelvan a tener el color de su cara. Cada simetría lleva giros
+    en giros (los reflejos cambian el sentido), así que conserva la
+    distancia al cubo resuelto.
+
+    """
+    coordenadas = _coordenadas_estampas()
+    posicion = {punto: i for i, punto in enumerate(coordenadas)}
+    simetrias = []
+    for ejes in permutations(range(3)):
+        for signos in product((1, -1), repeat=3):
+            destino = [posicion[tuple(signos[k] * punto[ejes[k]] for k in range(3))]
+                       for punto in coordenadas]
+            origen = [0] * 54
+            for i, j in enumerate(destino):
+                origen[j] = i
+            colores = tuple(destino[9 * cara + 4] // 9 for cara in range(6))
+            simetrias.append((tuple(origen), colores))
+    return simetrias
+
+
 class PbCuboRubik(busquedas.ProblemaBusqueda):
     """
     Modelo del Cubo de Rubik.
@@ -133,8 +189,18 @@ class PbCuboRubik(busquedas.ProblemaBusqueda):
     El orden de las caras seria el siguiente:
     0:Arriba(U), 1:Izquierda(L), 2:Frente(F), 3:Derecha(R), 4:Atras(B), 5:Abajo(D)
     """
+    usa_accion_previa = True
 
-    def __init__(self):
+    def __init__(self, simetrias=False):
+        """
+        @param simetrias: Si es True las búsquedas guardan un solo estado
+                          por clase de simetría (ver canonico). Cuesta unos
+                          20 microsegundos por estado, así que conviene en
+                          búsquedas desde la meta, no en las que parten de
+                          un cubo revuelto.
+
+        """
+        self.usa_simetrias = simetrias
         # Generamos dinámicamente la tupla meta, nueve ceroos, nueve unos, etc.
         # Esto crea la tupla de 54 elementos para el cubo resuelto.
         self.meta = tuple([i // 9 for i in range(54)])
@@ -144,13 +210,58 @@ class PbCuboRubik(busquedas.ProblemaBusqueda):
         # Giros de 90 grados en sentido antihorario (U', D', L', R', F', B')
         self.acciones_posibles = ['U', 'D', 'L', 'R', 'F', 'B', "U'", "D'", "L'", "R'", "F'", "B'"]
 
-    def acciones(self, estado):
-        # Todas las acciones son legales siempre
-        return self.acciones_posibles
+        # Cada giro se compila una sola vez en una permutación de las 54
+        # posiciones: la estampa que queda en i viene de permutaciones[a][i].
+        # El itemgetter hace la reunión completa en C.
+        identidad = tuple(range(54))
+        self.permutaciones = {accion: self._sucesor_referencia(identidad, accion)[0]
+                              for accion in self.acciones_posibles}
+        self._giros = {accion: itemgetter(*permutacion)
+                       for accion, permutacion in self.permutaciones.items()}
+
+        # Secuencias canónicas: después de un giro no se permite su inverso
+        # (lo deshace), después de X' no se permite X' (X' X' = X X) y las
+        # caras opuestas, que conmutan, solo se giran en el orden U-D, L-R,
+        # F-B. Quedan en promedio 9.5 acciones por nodo en lugar de 12.
+        opuesta_previa = {'D': 'U', 'R': 'L', 'B': 'F'}
+        self._acciones_tras = {None: self.acciones_posibles}
+        for previa in self.acciones_posibles:
+            self._acciones_tras[previa] = [
+                accion for accion in self.acciones_posibles
+                if accion != self.accion_inversa(previa)
+                and not (accion == previa and "'" in previa)
+                and accion[0] != opuesta_previa.get(previa[0])]
+
+        # Las 48 simetrías: origen de cada estampa, renombre de colores y
+        # la reunión compilada para construir el estado final
+        simetrias = _simetrias_cubo()
+        self._origenes = [origen for origen, _ in simetrias]
+        self._colores = [colores for _, colores in simetrias]
+        self._reuniones = [(itemgetter(*origen), bytes(colores) + bytes(250))
+                           for origen, colores in simetrias]
+
+    def acciones(self, estado, accion_previa=None):
+        # Todas las acciones son legales siempre; se omiten las redundantes
+        return self._acciones_tras[accion_previa]
 
     def sucesor(self, estado, accion):
+        # Una sola reunión con la permutación compilada del giro
+        return self._giros[accion](estado), 1
+
+    def sucesores_lote(self, estados):
+        # Las 12 permutaciones a la vez: renglón i * 12 + j es el giro j del estado i
+        if not hasattr(self, '_permutaciones_lote'):
+            self._permutaciones_lote = np.array([self.permutaciones[a] for a in self.acciones_posibles])
+        hijos = estados[:, self._permutaciones_lote].reshape(-1, 54)
+        m = len(estados)
+        return (hijos, np.repeat(np.arange(m), len(self.acciones_posibles)),
+                self.acciones_posibles * m, np.ones(len(hijos), dtype=int))
+
+    def _sucesor_referencia(self, estado, accion):
         """
         Calcula el nuevo estado del cubo despues de aplicar un giro.
+        Es la implementación original, giro por giro; se usa para compilar
+        las permutaciones y como referencia en verifica_tablas_movimiento.
 
         Un giro horario de una cara implica dos cosas:
         Rotar los 8 colores de la cara (8 por que el centro no se mueve)
@@ -219,6 +330,71 @@ class PbCuboRubik(busquedas.ProblemaBusqueda):
         # Terminamos cuando nuestro estado sea exactamente igual al cubo resuelto
         return estado == self.meta
 
+    def accion_inversa(self, accion):
+        # U <-> U', D <-> D', etc.
+        return accion[0] if "'" in accion else accion + "'"
+
+    def es_resoluble(self, estado):
+        """
+        Un acomodo de estampas se puede resolver si los centros están en su
+        lugar, cada esquina y arista es una pieza real que aparece una sola
+        vez, la suma de los giros de las esquinas es múltiplo de 3, la de
+        las aristas es par, y las permutaciones de esquinas y aristas tienen
+        la misma paridad (cada giro de cara es un 4-ciclo de cada una).
+
+        """
+        if len(estado) != 54 or any(estado[9 * cara + 4] != cara for cara in range(6)):
+            return False
+        try:
+            pe, oe, pa, oa = _piezas_rubik(estado)
+        except KeyError:
+            return False
+        if len(set(pe)) != 8 or len(set(pa)) != 12:
+            return False
+        return (sum(oe) % 3 == 0 and sum(oa) % 2 == 0 and
+                bd_patrones.paridad_permutacion(pe) == bd_patrones.paridad_permutacion(pa))
+
+    def estados_meta(self):
+        return [self.meta]
+
+    def codifica(self, estado):
+        """
+        Empaca las 54 estampas en un solo entero (un byte por estampa).
+        Se calcula a velocidad de C, ocupa unos 80 bytes en lugar de los
+        casi 500 de la tupla, y su hash es mucho más barato.
+
+        """
+        return int.from_bytes(bytes(estado), 'big')
+
+    def decodifica(self, codigo):
+        return tuple(codigo.to_bytes(54, 'big'))
+
+    def num_codigos(self):
+        return 1 << (8 * 54)
+
+    def canonico(self, estado):
+        """
+        El menor de los 48 estados simétricos a estado (ver _simetrias_cubo),
+        con lo que las búsquedas guardan hasta 48 veces menos estados.
+
+        Se compara estampa por estampa, quedándose solo con las simetrías
+        que dan el menor color hasta ahí; casi siempre queda una sola tras
+        pocas estampas y solo se construye su estado. Si tras 8 estampas
+        quedan varias (estados casi simétricos) se construyen todas.
+
+        """
+        candidatas = range(48)
+        origenes, colores = self._origenes, self._colores
+        for j in range(8):
+            valores = [colores[k][estado[origenes[k][j]]] for k in candidatas]
+            minimo = min(valores)
+            candidatas = [k for k, valor in zip(candidatas, valores) if valor == minimo]
+            if len(candidatas) == 1:
+                break
+        estampas = bytes(estado)
+        return min(reune(estampas.translate(tabla))
+                   for reune, tabla in map(self._reuniones.__getitem__, candidatas))
+
     @staticmethod
     def bonito(estado):
         """
@@ -237,6 +413,23 @@ class PbCuboRubik(busquedas.ProblemaBusqueda):
         return res
  
 
+class _EstampasMal(int):
+    """
+    Valor de h_1_problema_1 y h_2_problema_1: se comporta como el entero
+    de la cota, pero recuerda cuántas estampas están mal colocadas para
+    que su delta no tenga que volver a contarlas.
+
+    """
+    def __new__(cls, cota, mal):
+        valor = super().__new__(cls, cota)
+        valor.mal = mal
+        return valor
+
+    def __getnewargs__(self):
+        # Para pickle y copy (los procesos de paralelo.py mandan nodos con h)
+        return int(self), self.mal
+
+
 # ------------------------------------------------------------
 #  Desarrolla una política admisible.
 # ------------------------------------------------------------
@@ -255,7 +448,7 @@ def h_1_problema_1(nodo):
     cuadros_mal = sum(1 for i in range(54) if nodo.estado[i] != meta[i])
 
     # dividimos entre 24, el truco  de (cuadros_mal + 23) // 24 equivale a redondear hacia arriba
-    return (cuadros_mal + 23) // 24
+    return _EstampasMal((cuadros_mal + 23) // 24, cuadros_mal)
 
 
 # ------------------------------------------------------------
@@ -278,11 +471,271 @@ def h_2_problema_1(nodo):
     cuadros_mal = sum(1 for i in range(54) if nodo.estado[i] != meta[i])
 
     # Dividimos entre 20 (el limite real). Redondeamos hacia arriba.
-    return (cuadros_mal + 19) // 20
+    return _EstampasMal((cuadros_mal + 19) // 20, cuadros_mal)
+
+
+@lru_cache(maxsize=None)
+def _posiciones_movidas():
+    """
+    Las 20 estampas que cambia cada giro (las demás se quedan en su lugar).
+
+    """
+    return {accion: tuple(i for i, j in enumerate(permutacion) if i != j)
+            for accion, permutacion in PbCuboRubik().permutaciones.items()}
 
 
+def _delta_estampas(divisor):
+    """
+    Delta de las heurísticas de estampas: solo se revisan las 20 estampas
+    que movió el giro para actualizar la cuenta del padre.
 
-def compara_metodos(problema, pos_inicial, heuristica_1, heuristica_2):
+    """
+    def delta(h_padre, estado_padre, accion, estado_hijo):
+        mal = getattr(h_padre, 'mal', None)
+        if mal is None:
+            mal = sum(1 for i in range(54) if estado_padre[i] != i // 9)
+        for i in _posiciones_movidas()[accion]:
+            mal += (estado_hijo[i] != i // 9) - (estado_padre[i] != i // 9)
+        return _EstampasMal((mal + divisor - 1) // divisor, mal)
+    return delta
+
+
+h_1_problema_1.delta = _delta_estampas(24)
+h_2_problema_1.delta = _delta_estampas(20)
+
+
+if np is not None:
+    _META_RUBIK = np.arange(54) // 9
+
+    def _h_1_problema_1_lote(estados):
+        return ((estados != _META_RUBIK).sum(axis=1) + 23) // 24
+
+    def _h_2_problema_1_lote(estados):
+        return ((estados != _META_RUBIK).sum(axis=1) + 19) // 20
+
+    h_1_problema_1.lote = _h_1_problema_1_lote
+    h_2_problema_1.lote = _h_2_problema_1_lote
+
+
+# ------------------------------------------------------------
+#  Bases de datos de patrones para el cubo de Rubik
+# ------------------------------------------------------------
+
+# Estampas de cada esquina y de cada arista del cubo. La primera es la
+# estampa de referencia (la que está en U o D, o en F o B para las
+# aristas de en medio) y las esquinas siguen un orden cíclico consistente,
+# de modo que un giro solo rota la terna.
+ESQUINAS = ((0, 9, 38), (2, 36, 29), (6, 18, 11), (8, 27, 20),
+            (45, 17, 24), (47, 26, 33), (51, 44, 15), (53, 35, 42))
+ARISTAS = ((1, 37), (3, 10), (5, 28), (7, 19), (21, 14), (23, 30),
+           (39, 32), (41, 12), (46, 25), (48, 16), (50, 34), (52, 43))
+
+# Para cada terna (par) de colores leída en una posición, la pieza que es
+# y su orientación.
+_ESQUINAS_ORIENTADAS = {
+    tuple(ESQUINAS[e][(t - o) % 3] // 9 for t in range(3)): (e, o)
+    for e in range(8) for o in range(3)}
+_ARISTAS_ORIENTADAS = {
+    tuple(ARISTAS[a][(t - o) % 2] // 9 for t in range(2)): (a, o)
+    for a in range(12) for o in range(2)}
+
+
+def _piezas_rubik(estado):
+    """
+    Pasa un estado de estampas a la descripción por piezas.
+
+    @return: (pe, oe, pa, oa) donde pe[p] es la esquina que ocupa la
+             posición p y oe[p] su orientación (el lugar de su estampa de
+             referencia dentro de ESQUINAS[p]); pa y oa son lo mismo para
+             las aristas.
+
+    """
+    pe, oe = zip(*[_ESQUINAS_ORIENTADAS[estado[a], estado[b], estado[c]] for a, b, c in ESQUINAS])
+    pa, oa = zip(*[_ARISTAS_ORIENTADAS[estado[a], estado[b]] for a, b in ARISTAS])
+    return pe, oe, pa, oa
+
+
+@lru_cache(maxsize=None)
+def _movimientos_piezas():
+    """
+    Efecto de cada acción sobre las piezas, obtenido al aplicarla al cubo
+    resuelto: para cada acción y tipo de pieza, el par (destino, giro) con
+    la posición a la que va la pieza que está en cada posición y lo que
+    se le suma a su orientación.
+
+    """
+    problema = PbCuboRubik()
+    efectos = {'esquinas': [], 'aristas': []}
+    for accion in problema.acciones_posibles:
+        pe, oe, pa, oa = _piezas_rubik(problema.sucesor(problema.meta, accion)[0])
+        for tipo, perm, ori in (('esquinas', pe, oe), ('aristas', pa, oa)):
+            destino, giro = [0] * len(perm), [0] * len(perm)
+            for p, pieza in enumerate(perm):
+                destino[pieza], giro[pieza] = p, ori[p]
+            efectos[tipo].append((destino, giro))
+    return efectos
+
+
+class PatronRubik:
+    """
+    Abstracción del cubo donde solo se siguen algunas piezas de un tipo
+    (esquinas o aristas), con o sin su orientación. El resto de las piezas
+    se vuelven indistinguibles, así que la distancia en el espacio
+    abstracto es una cota inferior de la distancia real.
+
+    """
+    def __init__(self, tipo, piezas, orientacion=True):
+        if tipo not in ('esquinas', 'aristas'):
+            raise ValueError("El tipo de pieza debe ser 'esquinas' o 'aristas'.")
+        self.tipo = tipo
+        self.piezas = tuple(piezas)
+        self.orientacion = orientacion
+        self.n = 8 if tipo == 'esquinas' else 12
+        self.base = (3 if tipo == 'esquinas' else 2) if orientacion else 1
+        self.tam = bd_patrones.num_variaciones(self.n, len(self.piezas)) * self.base ** len(self.piezas)
+        self.nombre = (f"rubik_{tipo}_{'-'.join(map(str, self.piezas))}"
+                       f"{'_o' if orientacion else ''}.bdp")
+
+    def _rango(self, posiciones, orientaciones):
+        rango = bd_patrones.rango_variacion(posiciones, self.n)
+        if self.orientacion:
+            for o in orientaciones:
+                rango = rango * self.base + o
+        return rango
+
+    def rango(self, piezas):
+        """
+        Índice del estado abstracto.
+
+        @param piezas: El resultado de _piezas_rubik(estado).
+
+        """
+        perm, ori = piezas[:2] if self.tipo == 'esquinas' else piezas[2:]
+        donde = {pieza: p for p, pieza in enumerate(perm)}
+        posiciones = [donde[pieza] for pieza in self.piezas]
+        return self._rango(posiciones, [ori[p] for p in posiciones])
+
+    def _vecinos(self, rango):
+        k = len(self.piezas)
+        orientaciones = [0] * k
+        if self.orientacion:
+            for i in range(k - 1, -1, -1):
+                rango, orientaciones[i] = divmod(rango, self.base)
+        posiciones = bd_patrones.variacion_de_rango(rango, self.n, k)
+        for destino, giro in _movimientos_piezas()[self.tipo]:
+            yield self._rango([destino[p] for p in posiciones],
+                              [(o + giro[p]) % self.base for p, o in zip(posiciones, orientaciones)])
+
+    def construye(self):
+        """
+        Construye la tabla con una búsqueda a lo ancho desde el cubo resuelto.
+
+        """
+        meta = _piezas_rubik(PbCuboRubik().meta)
+        distancias = bd_patrones.distancias_bfs(self.tam, [self.rango(meta)], self._vecinos)
+        return bd_patrones.TablaPatrones.desde_distancias(distancias, bits=4)
+
+
+# Las esquinas en dos mitades con orientación más la permutación de las 8,
+# y las aristas en dos subconjuntos con orientación. Se pueden usar patrones
+# más grandes (por ejemplo las 8 esquinas con orientación) si se tiene el
+# tiempo de construirlos.
+PATRONES_RUBIK = (
+    PatronRubik('esquinas', range(8), orientacion=False),
+    PatronRubik('esquinas', (0, 1, 2, 3)),
+    PatronRubik('esquinas', (4, 5, 6, 7)),
+    PatronRubik('aristas', (0, 1, 2, 3)),
+    PatronRubik('aristas', (8, 9, 10, 11)),
+)
+
+_TABLAS_RUBIK = []
+
+
+def carga_patrones_rubik(patrones=PATRONES_RUBIK, directorio=None):
+    """
+    Carga (construyendo la primera vez) las tablas que usa h_pdb_rubik.
+
+    @param patrones: Una secuencia de objetos PatronRubik.
+    @param directorio: Dónde se guardan las tablas (bd_patrones.DIRECTORIO_TABLAS por omisión).
+
+    """
+    _TABLAS_RUBIK[:] = [(patron, bd_patrones.obten_tabla(patron.nombre, patron.construye, directorio))
+                        for patron in patrones]
+
+
+def h_pdb_rubik(nodo):
+    """
+    Heurística por bases de datos de patrones: el máximo de las distancias
+    exactas en cada abstracción. Cada una es una cota inferior del número
+    de giros, así que el máximo también es admisible.
+
+    """
+    if not _TABLAS_RUBIK:
+        carga_patrones_rubik()
+    piezas = _piezas_rubik(nodo.estado)
+    return max(tabla[patron.rango(piezas)] for patron, tabla in _TABLAS_RUBIK)
+
+
+def verifica_tablas_movimiento(num_revueltas=200, profundidad=25, semilla=0):
+    """
+    Comprueba en revueltas aleatorias que sucesor (con las permutaciones
+    compiladas) da exactamente lo mismo que la implementación original,
+    y mide el tiempo de cada una.
+
+    @return: (tiempo_tablas, tiempo_referencia) en segundos.
+
+    """
+    import random
+    import time
+
+    problema = PbCuboRubik()
+    azar = random.Random(semilla)
+    revueltas = [[azar.choice(problema.acciones_posibles) for _ in range(profundidad)]
+                 for _ in range(num_revueltas)]
+
+    tiempos = []
+    finales = []
+    for sucesor in (problema.sucesor, problema._sucesor_referencia):
+        inicio = time.perf_counter()
+        estados = []
+        for revuelta in revueltas:
+            estado = problema.meta
+            for accion in revuelta:
+                estado, _ = sucesor(estado, accion)
+                estados.append(estado)
+        tiempos.append(time.perf_counter() - inicio)
+        finales.append(estados)
+    if finales[0] != finales[1]:
+        raise AssertionError("Las tablas de movimiento no coinciden con la implementación original.")
+    return tuple(tiempos)
+
+
+def verifica_serializacion(num_revueltas=20, profundidad=10, semilla=0):
+    """
+    Comprueba que los valores de h_1_problema_1 y h_2_problema_1 (y de sus
+    delta) sobreviven a pickle y copy, como cuando se mandan entre procesos.
+
+    """
+    import copy
+    import pickle
+    import random
+
+    problema = PbCuboRubik()
+    azar = random.Random(semilla)
+    for _ in range(num_revueltas):
+        estado = problema.meta
+        for _ in range(profundidad):
+            estado, _ = problema.sucesor(estado, azar.choice(problema.acciones_posibles))
+        hijo, _ = problema.sucesor(estado, 'U')
+        for h in (h_1_problema_1, h_2_problema_1):
+            valor = h(busquedas.NodoBusqueda(estado))
+            for v in (valor, h.delta(valor, estado, 'U', hijo)):
+                for copia in (pickle.loads(pickle.dumps(v)), copy.copy(v), copy.deepcopy(v)):
+                    if copia != v or copia.mal != v.mal or type(copia) is not type(v):
+                        raise AssertionError("Los valores de la heurística no se serializan bien.")
+
+
+def compara_metodos(problema, pos_inicial, heuristica_1, heuristica_2, ida=False):
     """
     Compara en un cuadro lo nodos expandidos y el costo de la solución
     de varios métodos de búsqueda
@@ -291,6 +744,8 @@ def compara_metodos(problema, pos_inicial, heuristica_1, heuristica_2):
     @param pos_inicial: Una tupla con una posicion inicial
     @param heuristica_1: Una función de heurística
     @param heuristica_2: Una función de heurística
+    @param ida: Si es True se agrega IDA* con heuristica_2 (para el cubo,
+                donde A* se queda sin memoria con revueltas profundas)
 
     """
     solucion1, nodo1 = busquedas.busqueda_A_estrella(problema, pos_inicial, heuristica_1)
@@ -305,6 +760,11 @@ def compara_metodos(problema, pos_inicial, heuristica_1, heuristica_2):
     print('A* con h2'.center(12) 
           + str(solucion2.costo).center(20) 
           + str(nodo2))
+    if ida:
+        solucion3, nodo3 = busquedas.busqueda_IDA_estrella(problema, pos_inicial, heuristica_2)
+        print('IDA* con h2'.center(12)
+              + str(solucion3.costo).center(20)
+              + str(nodo3))
     print('-' * 50 + '\n')
 
 
@@ -328,5 +788,10 @@ if __name__ == "__main__":
     cubo_revuelto1, _ = problema.sucesor(cubo_resuelto, 'U')
     pos_inicial, _ = problema.sucesor(cubo_revuelto1, 'R')
 
-    compara_metodos(problema, pos_inicial, h_1_problema_1, h_2_problema_1)
+    compara_metodos(problema, pos_inicial, h_1_problema_1, h_2_problema_1, ida=True)
+
+    verifica_serializacion()
+    tiempo_tablas, tiempo_referencia = verifica_tablas_movimiento()
+    print(f"Tablas de movimiento: {tiempo_tablas:.4f}s contra {tiempo_referencia:.4f}s "
+          f"de la implementación original ({tiempo_referencia / tiempo_tablas:.1f}x)")
     
\ No newline at end of file
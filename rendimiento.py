@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+rendimiento.py
+--------------
+
+Banco de pruebas reproducible para los algoritmos de busquedas.py.
+
+Cada caso (conjunto, instancia, algoritmo) se corre en un proceso aparte
+con un tiempo límite, y se registra el tiempo de pared, los nodos por
+segundo, las expansiones y el máximo de memoria residente. Los
+resultados se escriben en JSON y se pueden comparar contra un archivo
+base para señalar regresiones:
+
+    python rendimiento.py --salida actual.json --base base.json
+
+Los conjuntos de instancias se generan con una semilla fija:
+
+    ocho_puzzle:   caminatas aleatorias de 10 a 30 pasos desde la meta
+                   clásica (0, 1, ..., 8), que es con la que h_1 y h_2
+                   de ocho_puzzle.py son admisibles.
+    quince_puzzle: las 100 instancias de Korf (1985) si se da el archivo
+                   con --korf (una instancia por renglón, 16 números,
+                   opcionalmente precedidos por el número de instancia);
+                   si no, caminatas aleatorias de 60 pasos.
+    cubo:          revueltas aleatorias de 3 a 8 giros.
+    camion:        el camión mágico de 1 hasta 10, 100, ..., 10^6.
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # No existe en Windows
+    resource = None
+
+import busquedas
+import paralelo
+
+
+# ------------------------------------------------------------
+#  Algoritmos
+# ------------------------------------------------------------
+
+ALGORITMOS = {
+    'ancho': lambda pb, s0, h, est: busquedas.busqueda_ancho(pb, s0, estadisticas=est),
+    'profundo': lambda pb, s0, h, est: busquedas.busqueda_profundo(pb, s0, estadisticas=est),
+    'profundidad_iterativa': lambda pb, s0, h, est: busquedas.busqueda_profundidad_iterativa(
+        pb, s0, estadisticas=est),
+    'costo_uniforme': lambda pb, s0, h, est: busquedas.busqueda_costo_uniforme(
+        pb, s0, estadisticas=est),
+    'A_estrella': lambda pb, s0, h, est: busquedas.busqueda_A_estrella(pb, s0, h, estadisticas=est),
+    'IDA_estrella': lambda pb, s0, h, est: busquedas.busqueda_IDA_estrella(
+        pb, s0, h, estadisticas=est),
+    'ancho_bidireccional': lambda pb, s0, h, est: busquedas.busqueda_ancho_bidireccional(
+        pb, s0, estadisticas=est),
+    'costo_uniforme_bidireccional': lambda pb, s0, h, est:
+        busquedas.busqueda_costo_uniforme_bidireccional(pb, s0, estadisticas=est),
+    'A_estrella_ponderado': lambda pb, s0, h, est: busquedas.busqueda_A_estrella(
+        pb, s0, h, estadisticas=est, peso=2),
+    'ARA_estrella': lambda pb, s0, h, est: _ultimo_plan(
+        busquedas.busqueda_ARA_estrella(pb, s0, h, estadisticas=est), est),
+    'haz': lambda pb, s0, h, est: busquedas.busqueda_haz(
+        pb, s0, h, ancho=500, max_profundidad=100, estadisticas=est),
+    'SMA_estrella': lambda pb, s0, h, est: busquedas.busqueda_SMA_estrella(
+        pb, s0, h, max_memoria=100000, estadisticas=est),
+    'frontera': lambda pb, s0, h, est: busquedas.busqueda_frontera(pb, s0, h, estadisticas=est),
+    'ancho_externa': lambda pb, s0, h, est: busquedas.busqueda_ancho_externa(
+        pb, s0, bytes_por_estado=_bytes_por_estado(pb), estadisticas=est),
+    'A_estrella_paralelo': lambda pb, s0, h, est: paralelo.busqueda_A_estrella_paralela(
+        pb, s0, h, estadisticas=est),
+}
+
+
+def _bytes_por_estado(problema):
+    """
+    Bytes con los que cabe cualquier código del problema (3 en el 8 puzzle,
+    6 en el 15 puzzle, 54 en el cubo). Sin num_codigos el caso queda como
+    no soportado.
+
+    """
+    return max(1, (problema.num_codigos() - 1).bit_length() + 7 >> 3)
+
+
+def _ultimo_plan(resultados, estadisticas):
+    """
+    Consume una búsqueda que va mejorando su plan y regresa el último
+    plan y los nodos expandidos, como las demás búsquedas.
+
+    """
+    nodo = None
+    for nodo, _ in resultados:
+        pass
+    return nodo, estadisticas.expandidos
+
+
+# ------------------------------------------------------------
+#  Conjuntos de instancias
+# ------------------------------------------------------------
+
+def _caminata(problema, s0, pasos, azar, permitida=None):
+    """
+    Estado al que se llega con una caminata aleatoria que no deshace el
+    último movimiento (o en la que cada acción cumple permitida(anterior,
+    accion), si se da).
+
+    """
+    if permitida is None:
+        permitida = lambda anterior, accion: accion != problema.accion_inversa(anterior)
+    estado, anterior = s0, None
+    for _ in range(pasos):
+        acciones = [a for a in problema.acciones(estado)
+                    if anterior is None or permitida(anterior, a)]
+        anterior = azar.choice(acciones)
+        estado, _ = problema.sucesor(estado, anterior)
+    return estado
+
+
+def _instancias_ocho_puzzle(semilla, ruta_korf=None):
+    import ocho_puzzle
+    problema = ocho_puzzle.Pb8Puzzle(meta=tuple(range(9)))
+    azar = random.Random(semilla)
+    meta = tuple(range(9)) + (0,)
+    return [(f"d{pasos}-{i}", list(_caminata(problema, meta, pasos, azar)))
+            for pasos in range(10, 31, 5) for i in range(2)]
+
+
+def _prepara_ocho_puzzle(datos):
+    import ocho_puzzle
+    return ocho_puzzle.Pb8Puzzle(meta=tuple(range(9))), tuple(datos), ocho_puzzle.h_2
+
+
+def lee_korf(ruta):
+    """
+    Lee las instancias del 15 puzzle de un archivo de texto.
+
+    @param ruta: Archivo con una instancia por renglón: 16 números (el 0
+                 es el vacío), opcionalmente precedidos del número de
+                 instancia. Los renglones vacíos y los que empiezan con #
+                 se ignoran.
+    @return: Una lista de (nombre, casillas).
+
+    """
+    instancias = []
+    with open(ruta) as archivo:
+        for renglon in archivo:
+            numeros = renglon.split()
+            if not numeros or numeros[0].startswith('#'):
+                continue
+            numeros = [int(x) for x in numeros]
+            nombre = str(numeros[0]) if len(numeros) == 17 else str(len(instancias) + 1)
+            casillas = numeros[-16:]
+            if sorted(casillas) != list(range(16)):
+                raise ValueError(f"Instancia inválida en {ruta}: {renglon.strip()}")
+            instancias.append((f"korf{nombre}", casillas))
+    return instancias
+
+
+def _instancias_quince_puzzle(semilla, ruta_korf=None):
+    import n_puzzle
+    if ruta_korf:
+        return lee_korf(ruta_korf)
+    problema = n_puzzle.PbNPuzzle(4, meta=range(16))
+    azar = random.Random(semilla)
+    meta = tuple(range(16)) + (0,)
+    return [(f"caminata60-{i}", list(_caminata(problema, meta, 60, azar)[:-1]))
+            for i in range(10)]
+
+
+def _prepara_quince_puzzle(datos):
+    # Las instancias de Korf usan la meta con el vacío en la esquina superior izquierda
+    import n_puzzle
+    problema = n_puzzle.PbNPuzzle(4, meta=range(16))
+    return problema, problema.estado_inicial(datos), n_puzzle.heuristica_conflicto_lineal(problema)
+
+
+def _instancias_cubo(semilla, ruta_korf=None):
+    import problemas
+    problema = problemas.PbCuboRubik()
+    azar = random.Random(semilla)
+    # Dos giros seguidos de la misma cara se pueden juntar en uno
+    return [(f"g{giros}", list(_caminata(problema, problema.meta, giros, azar,
+                                         lambda anterior, giro: giro[0] != anterior[0])))
+            for giros in range(3, 9)]
+
+
+def _prepara_cubo(datos):
+    import problemas
+    return problemas.PbCuboRubik(), tuple(datos), problemas.h_2_problema_1
+
+
+def _instancias_camion(semilla, ruta_korf=None):
+    return [(f"1e{k}", [1, 10 ** k]) for k in range(1, 7)]
+
+
+def _prepara_camion(datos):
+    import problemas
+    return problemas.PbCamionMagico(), tuple(datos), problemas.h_2_camion_magico
+
+
+CONJUNTOS = {
+    'ocho_puzzle': (_instancias_ocho_puzzle, _prepara_ocho_puzzle),
+    'quince_puzzle': (_instancias_quince_puzzle, _prepara_quince_puzzle),
+    'cubo': (_instancias_cubo, _prepara_cubo),
+    'camion': (_instancias_camion, _prepara_camion),
+}
+
+
+# ------------------------------------------------------------
+#  Ejecución
+# ------------------------------------------------------------
+
+def _corre_caso(conexion, conjunto, datos, algoritmo):
+    """
+    Resuelve un caso y manda el resultado por conexion (en el proceso hijo).
+
+    """
+    try:
+        problema, s0, heuristica = CONJUNTOS[conjunto][1](datos)
+        estadisticas = busquedas.EstadisticasBusqueda()
+        inicio = perf_counter()
+        nodo, expandidos = ALGORITMOS[algoritmo](problema, s0, heuristica, estadisticas)
+        segundos = perf_counter() - inicio
+        resultado = {'estado': 'resuelto' if nodo is not None else 'sin solucion',
+                     'costo': nodo.costo if nodo is not None else None,
+                     'expandidos': expandidos,
+                     'generados': estadisticas.generados,
+                     'segundos': segundos,
+                     'nodos_por_segundo': expandidos / segundos if segundos > 0 else None}
+    except NotImplementedError:
+        resultado = {'estado': 'no soportado'}
+    except Exception as error:
+        resultado = {'estado': 'error', 'error': repr(error)}
+    if resource is not None:
+        # En Linux ru_maxrss está en KiB, en macOS en bytes
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        resultado['max_rss_kb'] = maximo // 1024 if sys.platform == 'darwin' else maximo
+    conexion.send(resultado)
+    conexion.close()
+
+
+def corre_caso(conjunto, datos, algoritmo, tiempo_limite=10.0):
+    """
+    Corre un caso en un proceso nuevo, matándolo si rebasa el tiempo límite.
+
+    @return: Un diccionario con el estado ('resuelto', 'sin solucion',
+             'tiempo agotado', 'no soportado' o 'error') y las medidas.
+
+    """
+    contexto = multiprocessing.get_context('spawn')
+    padre, hijo = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_corre_caso, args=(hijo, conjunto, datos, algoritmo))
+    proceso.start()
+    hijo.close()
+    if padre.poll(tiempo_limite):
+        try:
+            resultado = padre.recv()
+        except EOFError:
+            resultado = {'estado': 'error', 'error': 'el proceso terminó sin resultado'}
+    else:
+        proceso.kill()
+        resultado = {'estado': 'tiempo agotado'}
+    proceso.join()
+    if proceso.exitcode not in (0, None) and resultado['estado'] != 'tiempo agotado':
+        resultado = {'estado': 'error', 'error': f"código de salida {proceso.exitcode}"}
+    return resultado
+
+
+def corre_banco(conjuntos=None, algoritmos=None, tiempo_limite=10.0, semilla=0,
+                ruta_korf=None, max_instancias=None, reporta=print):
+    """
+    Corre todos los casos pedidos.
+
+    @param conjuntos: Nombres de CONJUNTOS (todos por omisión).
+    @param algoritmos: Nombres de ALGORITMOS (todos por omisión).
+    @param tiempo_limite: Segundos por caso.
+    @param semilla: Semilla para generar las instancias.
+    @param ruta_korf: Archivo con las instancias de Korf del 15 puzzle.
+    @param max_instancias: Si no es None, cuántas instancias usar por conjunto.
+    @param reporta: Función a la que se le pasa un renglón por caso terminado
+                    (None para no reportar).
+    @return: Un diccionario listo para guardarse como JSON.
+
+    """
+    casos = []
+    for conjunto in conjuntos or CONJUNTOS:
+        instancias = CONJUNTOS[conjunto][0](semilla, ruta_korf)[:max_instancias]
+        for nombre, datos in instancias:
+            for algoritmo in algoritmos or ALGORITMOS:
+                resultado = corre_caso(conjunto, datos, algoritmo, tiempo_limite)
+                resultado.update(conjunto=conjunto, instancia=nombre, algoritmo=algoritmo)
+                casos.append(resultado)
+                if reporta is not None:
+                    reporta(_renglon(resultado))
+    return {'version': 1,
+            'semilla': semilla,
+            'tiempo_limite': tiempo_limite,
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'casos': casos}
+
+
+def _renglon(caso):
+    cadena = f"{caso['conjunto']:>14} {caso['instancia']:>14} {caso['algoritmo']:>29} {caso['estado']:>15}"
+    if caso['estado'] == 'resuelto':
+        cadena += (f" costo {caso['costo']:<8} {caso['expandidos']:>10} exp"
+                   f" {caso['segundos']:9.3f} s {caso['nodos_por_segundo']:12.0f} nodos/s")
+    return cadena
+
+
+def compara(actual, base, umbral=0.10, minimo_segundos=0.05):
+    """
+    Compara dos reportes de corre_banco.
+
+    Se considera regresión cuando un caso que se resolvía ya no se
+    resuelve, cuando cambia el costo de la solución, cuando aumentan las
+    expansiones, o cuando el tiempo crece más de umbral (solo si alguno
+    de los dos tiempos pasa de minimo_segundos, para ignorar el ruido).
+
+    @return: Una lista de cadenas, una por regresión.
+
+    """
+    anteriores = {(c['conjunto'], c['instancia'], c['algoritmo']): c for c in base['casos']}
+    regresiones = []
+    for caso in actual['casos']:
+        llave = (caso['conjunto'], caso['instancia'], caso['algoritmo'])
+        anterior = anteriores.get(llave)
+        if anterior is None or anterior['estado'] != 'resuelto':
+            continue
+        nombre = '/'.join(llave)
+        if caso['estado'] != 'resuelto':
+            regresiones.append(f"{nombre}: {caso['estado']} (antes se resolvía)")
+            continue
+        if caso['costo'] != anterior['costo']:
+            regresiones.append(f"{nombre}: costo {caso['costo']} contra {anterior['costo']}")
+        if caso['expandidos'] > anterior['expandidos'] * (1 + umbral):
+            regresiones.append(f"{nombre}: {caso['expandidos']} expansiones "
+                               f"contra {anterior['expandidos']}")
+        if (max(caso['segundos'], anterior['segundos']) > minimo_segundos and
+                caso['segundos'] > anterior['segundos'] * (1 + umbral)):
+            regresiones.append(f"{nombre}: {caso['segundos']:.3f} s "
+                               f"contra {anterior['segundos']:.3f} s")
+    return regresiones
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Banco de pruebas de busquedas.py")
+    parser.add_argument('--conjuntos', nargs='+', choices=list(CONJUNTOS))
+    parser.add_argument('--algoritmos', nargs='+', choices=list(ALGORITMOS))
+    parser.add_argument('--tiempo', type=float, default=10.0, help="segundos por caso")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--instancias', type=int, help="máximo de instancias por conjunto")
+    parser.add_argument('--korf', help="archivo con las 100 instancias de Korf")
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--base', help="archivo JSON contra el cual comparar")
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help="aumento relativo que se considera regresión")
+    argumentos = parser.parse_args()
+
+    reporte = corre_banco(argumentos.conjuntos, argumentos.algoritmos, argumentos.tiempo,
+                          argumentos.semilla, argumentos.korf, argumentos.instancias)
+    if argumentos.salida:
+        with open(argumentos.salida, 'w') as archivo:
+            json.dump(reporte, archivo, indent=1, ensure_ascii=False)
+    if argumentos.base:
+        with open(argumentos.base) as archivo:
+            regresiones = compara(reporte, json.load(archivo), argumentos.umbral)
+        for regresion in regresiones:
+            print("REGRESIÓN", regresion)
+        sys.exit(1 if regresiones else 0)